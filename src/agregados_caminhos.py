@@ -0,0 +1,136 @@
+"""
+Agregados pré-calculados sobre todos os caminhos
+Decodifica as 393.216 linhas de caminhos.parquet de uma vez (colunas de
+vencedor/perdedor por partida) e resume em tabelas pequenas: quem ocupa
+e quem vence cada partida, em que rodada cada time cai e a chance de
+cada par de times se enfrentar. As permutações de adversários têm o
+mesmo peso (como na aba de estatísticas).
+Gera: data/agregados_caminhos.parquet
+"""
+
+from __future__ import annotations
+import os
+from dataclasses import dataclass
+import numpy as np
+import pandas as pd
+from codificacao_caminhos import ler_caminhos
+from plano_chave import PLANO
+from probabilidades import FIXOS, INDICE, PERMUT, TIMES
+
+CAMINHOS  = "data/caminhos.parquet"
+AGREGADOS = "data/agregados_caminhos.parquet"
+
+PARTIDAS = PLANO.ids
+BIT      = PLANO.bit
+QUALQUER = "Qualquer"                     # encontro em qualquer partida
+
+# Rodada em que o time é eliminado (do plano) ou "Campeão"
+RODADAS = PLANO.rodadas + ["Campeão"]
+
+# ── 1. Decodificação vetorizada ───────────────────────────────
+def decodificar(perm: np.ndarray, mascara: np.ndarray):
+    """Índices (em TIMES) do vencedor e do perdedor de cada partida: arrays n × 14."""
+    fixos = np.array([INDICE[t] for t in FIXOS], dtype=np.int8)
+    adversarios = np.array([[INDICE[t] for t in p] for p in PERMUT], dtype=np.int8)[perm]
+    entradas = np.hstack([np.broadcast_to(fixos, (len(perm), len(fixos))), adversarios])
+    mascara = mascara.astype(np.int64)
+    V = PLANO.executar_lote(entradas, lambda k, a, b: (mascara >> k & 1).astype(bool))
+    e, m = PLANO.n_entradas, PLANO.n_jogos
+    return V[e:e + m].T, V[e + m:].T
+
+# ── 2. Tabelas ────────────────────────────────────────────────
+@dataclass(frozen=True)
+class Agregados:
+    ocupacao: np.ndarray      # partidas × times: time joga a partida
+    vitoria: np.ndarray       # partidas × times: time vence a partida
+    eliminacao: np.ndarray    # times × RODADAS: rodada em que o time cai
+    encontro: np.ndarray      # (partidas + Qualquer) × times × times, simétrica
+
+    def prob_encontro(self, a: str, b: str, partida: str = QUALQUER) -> float:
+        k = len(PARTIDAS) if partida == QUALQUER else BIT[partida]
+        return float(self.encontro[k, INDICE[a], INDICE[b]])
+
+    def prob_eliminacao(self, time: str, rodada: str) -> float:
+        return float(self.eliminacao[INDICE[time], RODADAS.index(rodada)])
+
+    def prob_vitoria(self, time: str, partida: str) -> float:
+        return float(self.vitoria[BIT[partida], INDICE[time]])
+
+    def prob_ocupacao(self, time: str, partida: str) -> float:
+        return float(self.ocupacao[BIT[partida], INDICE[time]])
+
+def agregar(df: pd.DataFrame) -> Agregados:
+    """Resume um DataFrame com perm, mascara e probabilidade (todas as linhas)."""
+    t, m = len(TIMES), PLANO.n_jogos
+    W, L = decodificar(df["perm"].to_numpy(), df["mascara"].to_numpy())
+    w = df["probabilidade"].to_numpy() / len(PERMUT)
+    wk = np.broadcast_to(w[:, None], W.shape).ravel()
+    jogo = np.broadcast_to(np.arange(m), W.shape).ravel()
+
+    vitoria = np.bincount(jogo * t + W.ravel(), wk, m * t).reshape(m, t)
+    derrota = np.bincount(jogo * t + L.ravel(), wk, m * t).reshape(m, t)
+
+    cai = np.broadcast_to(PLANO.rodada_do_perdedor, L.shape).ravel()
+    sai = cai >= 0
+    eliminacao = np.bincount(L.ravel()[sai] * len(RODADAS) + cai[sai], wk[sai],
+                             t * len(RODADAS)).reshape(t, len(RODADAS))
+    eliminacao[:, -1] = vitoria[BIT["GF"]]
+
+    par = np.minimum(W, L).astype(np.int64) * t + np.maximum(W, L)
+    encontro = np.zeros((m + 1, t, t))
+    encontro[:m] = np.bincount(jogo * t * t + par.ravel(), wk, m * t * t).reshape(m, t, t)
+    unicos = np.sort(par, axis=1)              # um par pode se repetir (ex.: U1 e GF)
+    novo = np.ones(unicos.shape, dtype=bool)
+    novo[:, 1:] = unicos[:, 1:] != unicos[:, :-1]
+    encontro[m] = np.bincount(unicos[novo], np.broadcast_to(w[:, None], W.shape)[novo],
+                              t * t).reshape(t, t)
+    encontro = encontro + encontro.transpose(0, 2, 1)
+
+    return Agregados(ocupacao=vitoria + derrota, vitoria=vitoria,
+                     eliminacao=eliminacao, encontro=encontro)
+
+# ── 3. Gravação e leitura (formato longo) ─────────────────────
+def para_tabela(ag: Agregados) -> pd.DataFrame:
+    partes = []
+    for nome, M in (("ocupacao", ag.ocupacao), ("vitoria", ag.vitoria)):
+        for k, mid in enumerate(PARTIDAS):
+            partes += [(nome, mid, TIMES[i], "", p) for i, p in enumerate(M[k])]
+    for i, time in enumerate(TIMES):
+        partes += [("eliminacao", r, time, "", p) for r, p in zip(RODADAS, ag.eliminacao[i])]
+    for k, mid in enumerate(PARTIDAS + [QUALQUER]):
+        for i, a in enumerate(TIMES):
+            partes += [("encontro", mid, a, b, ag.encontro[k, i, j])
+                       for j, b in enumerate(TIMES) if j != i]
+    return pd.DataFrame(partes, columns=["tabela", "partida", "time", "adversario",
+                                         "probabilidade"])
+
+def de_tabela(df: pd.DataFrame) -> Agregados:
+    t, m = len(TIMES), PLANO.n_jogos
+    k = {mid: i for i, mid in enumerate(PARTIDAS + [QUALQUER])}
+    ag = Agregados(np.zeros((m, t)), np.zeros((m, t)),
+                   np.zeros((t, len(RODADAS))), np.zeros((m + 1, t, t)))
+    for tabela, partida, time, adv, p in df.itertuples(index=False):
+        if tabela == "eliminacao":
+            ag.eliminacao[INDICE[time], RODADAS.index(partida)] = p
+        elif tabela == "encontro":
+            ag.encontro[k[partida], INDICE[time], INDICE[adv]] = p
+        else:
+            getattr(ag, tabela)[k[partida], INDICE[time]] = p
+    return ag
+
+def salvar_agregados(ag: Agregados, destino: str = AGREGADOS):
+    para_tabela(ag).to_parquet(destino, index=False)
+
+def ler_agregados(caminho: str = AGREGADOS, origem: str = CAMINHOS) -> Agregados:
+    """Lê as tabelas gravadas; sem o arquivo, agrega direto de `origem`."""
+    if os.path.exists(caminho):
+        return de_tabela(pd.read_parquet(caminho))
+    return agregar(ler_caminhos(origem, colunas=["perm", "mascara", "probabilidade"]))
+
+def main():
+    ag = agregar(ler_caminhos(CAMINHOS, colunas=["perm", "mascara", "probabilidade"]))
+    salvar_agregados(ag)
+    print(pd.DataFrame(ag.eliminacao * 100, index=TIMES, columns=RODADAS).round(2))
+
+if __name__ == "__main__":
+    main()
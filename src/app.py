@@ -1,60 +1,57 @@
 import streamlit as st
 import pandas as pd
-import re, os, random, itertools, io
+import io, json, os
 import matplotlib.pyplot as plt
-from matplotlib.offsetbox import OffsetImage, AnnotationBbox
-from matplotlib.patches import Rectangle
+from matplotlib.offsetbox import AnnotationBbox
+from agregados_caminhos import PARTIDAS, QUALQUER, RODADAS, ler_agregados
+from bracket_grafico import logo, render_bracket
+from cenarios_provaveis import BuscaInterrompida, cenarios_campeonato
+from fases_exatas import FASES, probabilidades_condicionais, probabilidades_fases
+from codificacao_caminhos import indice_por_campeao, ler_caminhos, linhas_caminho
+from plano_chave import PLANO
+from historico_elo import HISTORICO, ler_historico
+from incerteza_elo import incerteza, resumo
+from probabilidades import TIMES, carregar, carregar_em
+from cache_resultados import cache, chave, hash_elo
+from instrumentacao import Instrumentacao
 
 # ───────────────────── Arquivos de dados ─────────────────────
-PARQUET = "data/caminhos.parquet"
-LOGOS   = "logos"
-ELO_CSV = "data/elo_final_campeonato.csv"
+PARQUET   = "data/caminhos.parquet"
+AGREGADOS = "data/agregados_caminhos.parquet"
+
+# Versão do que vai para o cache em disco (.cache/): mude ao alterar a
+# tabela ou o gráfico de estatísticas, para não servir resultados antigos
+VERSAO_ESTATISTICAS = 1
 
 # ─────────────────── Função load_data ────────────────────────
 @st.cache_resource
 def load_data():
-    df = pd.read_parquet(PARQUET)
-    df["probabilidade"] = df["probabilidade"].astype(float)
-    norm = lambda s: re.sub(r"[^A-Za-z0-9]", "", s).upper()
-    df["campeao_clean"] = df["campeao"].apply(norm)
-    return df, sorted(df["campeao_clean"].unique())
+    if not os.path.exists(PARQUET):        # sem a enumeração: busca direta (ver abaixo)
+        return None, sorted(TIMES), None
+    # só as colunas usadas; campeão já vem como categoria (sem normalização)
+    df = ler_caminhos(PARQUET, colunas=["perm", "mascara", "probabilidade", "campeao"])
+    indice = indice_por_campeao(df)        # ordenado uma vez; filtros viram fatias
+    return df, sorted(t for t in indice if t != "Todos"), indice
+
+@st.cache_data
+def busca_cenarios(k: int, campeao: str, menos: bool, elo: str):
+    # os k cenários pedidos saem de uma busca best-first na árvore da chave;
+    # `elo` (hash dos ratings) separa o cache de cada data de ratings
+    return cenarios_campeonato(k, None if campeao == "Todos" else campeao, menos, modelo.P)
+
+@st.cache_data
+def intervalos_fases(n: int, ate):
+    # réplicas do histórico (bootstrap) → cálculo exato em lote; ~0,25 s com 1000
+    return resumo(incerteza(n, 0, ate))
 
-# ─────────────────── Constantes visuais ──────────────────────
-BOX_W, BOX_H = 2.6, 1.5
-GAP_X, DY    = 0.28, 0.40
-ZOOM         = 0.08
+@st.cache_resource
+def load_agregados():
+    # tabelas pequenas (encontros, eliminação); sem o arquivo, agrega os caminhos
+    return ler_agregados(AGREGADOS, PARQUET)
 
 # ──────────────── Dados de elo (para probabilidades) ─────────
-df_elo = pd.read_csv(ELO_CSV)
-elos   = dict(zip(df_elo["time"], df_elo["elo_final"]))
-
-# ─────────────────── Layout fixo do bracket ──────────────────
-COL = {"qf": -0.2, "sf": 2.6, "uf": 5.4, "gf": 8.2}
-POS = {  
-    "U1": (COL["qf"], 10), "U2": (COL["qf"],  8),
-    "U3": (COL["qf"],  6), "U4": (COL["qf"],  4),
-    "U5": (COL["sf"],  9), "U6": (COL["sf"],  5),
-    "U7": (COL["uf"],  7),
-    "L1": (COL["qf"],  1.5), "L2": (COL["qf"], -0.5),
-    "L3": (COL["sf"],  1.5), "L4": (COL["sf"], -0.5),
-    "L5": (COL["uf"],  0.5), "L6": (COL["gf"],  1.5),
-    "GF": (COL["gf"],  7),
-}
-LABEL_PAD = 0.25
-PHASE_TO_TOP = {
-    "Upper Quarterfinals": "U1",
-    "Upper Semifinals":    "U5",
-    "Upper Final":         "U7",
-    "Grand Final":         "GF",
-    "Lower Round 1":       "L1",
-    "Lower Round 2":       "L3",
-    "Lower Round 3":       "L5",
-    "Lower Final":         "L6",
-}
-PHASE_LABELS = {
-    lbl: (POS[mid][0], POS[mid][1] + BOX_H/2 + LABEL_PAD)
-    for lbl, mid in PHASE_TO_TOP.items()
-}
+modelo = carregar()                   # matriz P + índices, lidos uma vez
+elos   = modelo.elos
 
 # ────────────── Nomes das partidas ──────────────────
 PHASE_DISPLAY = {
@@ -75,112 +72,53 @@ PHASE_DISPLAY = {
 }
 
 # ───────────────────────── Helpers ───────────────────────────
-def logo(team: str):
-    f = os.path.join(LOGOS, f"{team}.png")
-    return OffsetImage(plt.imread(f), zoom=ZOOM) if os.path.exists(f) else None
-
-def draw_box(ax, x, y, win, lose, prob):
-    ax.add_patch(Rectangle((x, y-BOX_H/2), BOX_W, BOX_H,
-                           fc="white", ec="black"))
-    if (img := logo(win)):
-        ax.add_artist(AnnotationBbox(img, (x+0.15, y+DY), frameon=False))
-    ax.text(x+0.15+GAP_X, y+DY, win, weight="bold", va="center", fontsize=8)
-    ax.text(x+BOX_W-0.30, y+DY, f"{prob:.0f}%",
-            ha="right", va="center", fontsize=8)
-    ax.text(x+BOX_W-0.10, y+DY, "✔", color="green",
-            ha="right", va="center")
-    if (img2 := logo(lose)):
-        ax.add_artist(AnnotationBbox(img2, (x+0.15, y-DY), frameon=False))
-    ax.text(x+0.15+GAP_X, y-DY, lose, va="center", fontsize=8)
-
-def parse_path(lines):
-    d={}
-    for ln in lines:
-        fase, resto = ln.split(":",1)
-        w, resto2   = resto.strip().split(">")
-        l, p        = resto2.split("(")
-        d[fase.strip()] = (w.strip(), l.strip(), float(p.replace("%)","")))
-    return d
-
-def resolve_choice(src, wins, losses):
-    if src in elos:                   
-        return src
-    tag, mid = src[0], src[2:-1]      
-    table = wins if tag=="W" else losses
-    return table.get(mid)
+# O simulador manual roda o plano compilado (ver plano_chave): uma lista
+# de vagas [entradas | vencedores | perdedores], com None ainda em aberto.
+def vagas_do_estado(entradas: list, winners: dict, losers: dict) -> list:
+    vagas = PLANO.vagas_iniciais(entradas)
+    for k, mid in enumerate(PLANO.ids):
+        vagas[PLANO.vaga_vencedor(k)] = winners.get(mid)
+        vagas[PLANO.vaga_perdedor(k)] = losers.get(mid)
+    return vagas
 
 # ─────────────── Utilitário de rebuild após undo ─────────────
-def rebuild_from_choices(choices: dict, agenda: list):
+def rebuild_from_choices(choices: dict, entradas: list):
+    vagas = PLANO.vagas_iniciais(entradas)
     winners, losers = {}, {}
     prob = 1.0
-    for mid, A, B in agenda:
+    for k, mid in enumerate(PLANO.ids):
         if mid not in choices:
             continue
-        a = resolve_choice(A, winners, losers)
-        b = resolve_choice(B, winners, losers)
-        if not (a and b):  
+        a, b = PLANO.confronto(vagas, k)
+        if not (a and b):
             break
-        vencedor           = choices[mid]
-        perdedor           = b if vencedor == a else a
-        winners[mid]       = vencedor
-        losers[mid]        = perdedor
-        pa = 1 / (1 + 10 ** ((elos[perdedor] - elos[vencedor]) / 400))
-        prob *= pa if vencedor == a else (1 - pa)
+        PLANO.jogar(vagas, k, choices[mid] == b)
+        winners[mid] = vagas[PLANO.vaga_vencedor(k)]
+        losers[mid]  = vagas[PLANO.vaga_perdedor(k)]
+        prob *= modelo.p(winners[mid], losers[mid])
     return winners, losers, prob
 
 # ─────────────── Bracket com botões de download ──────────────
-def plot_bracket(path_lines):
-    info=parse_path(path_lines)
-    fig,ax=plt.subplots(figsize=(13,7))
-    ax.axis("off"); ax.set_xlim(-0.5,11); ax.set_ylim(-2.5,12)
-    for lbl,(x,y) in PHASE_LABELS.items():
-        ax.text(x+BOX_W/2, y, lbl, ha="center", weight="bold", fontsize=11)
-    for mid,(x,y) in POS.items():
-        if mid in info: draw_box(ax,x,y,*info[mid])
-    st.pyplot(fig)
+def plot_bracket(perm, mascara):
+    # imagem em cache por caminho e data dos ratings; o PDF só é gerado se o
+    # download for pedido
+    data=data_ratings if passado else None
+    with inst.span("plot_bracket"):
+        png=render_bracket(perm, mascara, "png", data)
+    st.image(png, width="stretch")
     for fmt,mime in [("png","image/png"),("pdf","application/pdf")]:
-        buf=io.BytesIO(); fig.savefig(buf,format=fmt,bbox_inches="tight")
         st.download_button(f"Baixar bracket ({fmt.upper()})",
-                           buf.getvalue(), file_name=f"bracket.{fmt}", mime=mime)
-    plt.close(fig)
+                           lambda fmt=fmt: render_bracket(perm, mascara, fmt, data),
+                           file_name=f"bracket.{fmt}", mime=mime,
+                           key=f"dl_{perm}_{mascara}_{fmt}")
 
 # ───────────── Estatísticas (gráfico + download) ─────────────
-def estatisticas_fase(sim_por_perm=2000):
-    times=df_elo.sort_values("elo_final",ascending=False)["time"].tolist()
-    variaveis=["PRX","SEN","MIBR","TH"]
-    perms=list(itertools.permutations(variaveis))
-    tally={t:{"Semifinal":0,"Final":0,"Vencedor":0} for t in times}
-    def p(a,b): return 1/(1+10**((elos[b]-elos[a])/400))
-    def jogo(a,b): return a if random.random()<p(a,b) else b
-    def sim(adv):
-        f={t:"QF" for t in elos}
-        uqf=[("G2",adv[0]),("XLG",adv[1]),("FNC",adv[2]),("RRQ",adv[3])]
-        win,los=[],[]
-        for a,b in uqf:
-            w=jogo(a,b); l=b if w==a else a
-            win.append(w); los.append(l)
-        us1=jogo(win[0],win[1]); us2=jogo(win[2],win[3])
-        f[us1]=f[us2]="Semifinal"
-        uf=jogo(us1,us2); f[uf]="Final"
-        lr1=jogo(los[0],los[1]); lr2=jogo(los[2],los[3])
-        lr3=jogo(lr1,lr2); f[lr3]="Semifinal"
-        lf=jogo(us1 if us1!=uf else us2, lr3); f[lf]="Final"
-        gf=jogo(uf,lf); f[gf]="Vencedor"; return f
-    with st.spinner("Simulando estatísticas…"):
-        for perm in perms:
-            for _ in range(sim_por_perm):
-                fases=sim(perm)
-                for t,fs in fases.items():
-                    if fs=="Semifinal": tally[t]["Semifinal"] += 1
-                    elif fs=="Final":
-                        tally[t]["Semifinal"] += 1
-                        tally[t]["Final"]     += 1
-                    elif fs=="Vencedor":
-                        tally[t]["Semifinal"] += 1
-                        tally[t]["Final"]     += 1
-                        tally[t]["Vencedor"]  += 1
-    total = sim_por_perm * len(perms)
-    df=pd.DataFrame(tally).T.div(total).mul(100).loc[times]
+def _render_estatisticas():
+    inst.contar("estatisticas_renderizadas")
+    tally=probabilidades_fases(modelo.P,modelo.indices(["G2","XLG","FNC","RRQ"]),
+                               modelo.indices(["PRX","SEN","MIBR","TH"]))
+    df=pd.DataFrame(tally,index=modelo.times,columns=FASES).mul(100)
+    df=df.loc[modelo.ordenados]
 
     fig,ax=plt.subplots(figsize=(12,6))
     df.plot(kind="bar",stacked=True,colormap="Set2",ax=ax)
@@ -188,19 +126,63 @@ def estatisticas_fase(sim_por_perm=2000):
     ax.grid(True,axis="y",ls="--",alpha=0.6)
     ax.set_xticks([])
     for i,team in enumerate(df.index):
-        path=os.path.join(LOGOS,f"{team}.png")
-        if os.path.exists(path):
-            img=plt.imread(path)
-            ax.add_artist(AnnotationBbox(OffsetImage(img,zoom=0.12),
+        if (img:=logo(team,zoom=0.12)):
+            ax.add_artist(AnnotationBbox(img,
                                          (i,-9.5),frameon=False,
                                          box_alignment=(0.5,0.5)))
         ax.text(i,-17.5,team,ha="center",va="top",fontsize=10)
-    ax.set_ylim(-22,140); plt.tight_layout(); st.pyplot(fig)
-    for fmt,mime in [("png","image/png"),("pdf","application/pdf")]:
+    ax.set_ylim(-22,140); fig.tight_layout()
+    res={"tabela": df}
+    for fmt in ("png","pdf"):
         buf=io.BytesIO(); fig.savefig(buf,format=fmt,bbox_inches="tight")
-        st.download_button(f"Baixar gráfico ({fmt.upper()})",
-                           buf.getvalue(), file_name=f"estatisticas.{fmt}", mime=mime)
+        res[fmt]=buf.getvalue()
     plt.close(fig)
+    return res
+
+def estatisticas_fase():
+    # tabela + imagens em cache (memória → disco), chave = versão + Elo + método
+    k=chave("estatisticas", VERSAO_ESTATISTICAS, hash_elo(modelo.elos), "exato")
+    with inst.span("grafico"):
+        res=cache("estatisticas").obter_ou_calcular(k, _render_estatisticas)
+    st.image(res["png"], width="stretch")
+    for fmt,mime in [("png","image/png"),("pdf","application/pdf")]:
+        st.download_button(f"Baixar gráfico ({fmt.upper()})",
+                           res[fmt], file_name=f"estatisticas.{fmt}", mime=mime)
+
+    # incerteza dos ratings, calculada só quando pedida
+    st.subheader("Incerteza dos ratings")
+    st.caption("O histórico de partidas é reamostrado com reposição e cada réplica "
+               "dá um novo Elo; o intervalo mostra a faixa central de 95% das chances.")
+    c1,c2=st.columns(2)
+    n=c1.selectbox("Réplicas",[200,500,1000,2000],index=2,key="inc_n")
+    fase=c2.selectbox("Fase",FASES,index=len(FASES)-1,key="inc_fase")
+    if st.button("Calcular intervalos",key="inc_btn"):
+        st.session_state.inc_pedido=True
+    if st.session_state.get("inc_pedido"):
+        with inst.span("incerteza"):
+            tab=intervalos_fases(n,data_ratings if passado else None)
+        tab=tab[tab.fase==fase].drop(columns="fase").set_index("time")
+        st.dataframe(tab,width="stretch",column_config={
+            c: st.column_config.NumberColumn(format="%.2f%%") for c in tab.columns})
+
+    # consultas respondidas pelos agregados pré-calculados (ratings atuais)
+    if passado:
+        st.caption("Confrontos e eliminação: disponíveis só com os ratings atuais.")
+        return
+    with inst.span("agregados"):
+        ag=load_agregados()
+    st.subheader("Confrontos e eliminação")
+    c1,c2,c3=st.columns(3)
+    a=c1.selectbox("Time",modelo.ordenados,key="ag_a")
+    b=c2.selectbox("Adversário",[t for t in modelo.ordenados if t!=a],key="ag_b")
+    partida=c3.selectbox("Partida",[QUALQUER]+PARTIDAS,key="ag_partida",
+                         format_func=lambda m: PHASE_DISPLAY.get(m,m))
+    st.metric(f"Chance de {a} enfrentar {b}",
+              f"{ag.prob_encontro(a,b,partida)*100:.2f}%")
+    elim=pd.DataFrame(ag.eliminacao*100,index=TIMES,columns=RODADAS)
+    st.markdown("**Rodada em que cada time é eliminado**")
+    st.dataframe(elim.loc[modelo.ordenados],width="stretch",column_config={
+        r: st.column_config.NumberColumn(format="%.2f%%") for r in RODADAS})
 
 # ──────────────── Simulador campeonato ─────────────
 def simulador_manual():
@@ -239,28 +221,13 @@ def simulador_manual():
             if st.button("Confirmar confrontos iniciais"):
                 st.session_state.opponents = selecao
                 st.rerun()
-        st.stop()
+        return
 
     opponents = st.session_state.opponents
 
-    # ── Agenda fixa para simulador manual ────────────────────────
-    AGENDA_MANUAL = [
-        ("U1", "G2",  opponents[0]),
-        ("U2", "XLG", opponents[1]),
-        ("U3", "FNC", opponents[2]),
-        ("U4", "RRQ", opponents[3]),
-        ("U5", "W(U1)", "W(U2)"),
-        ("U6", "W(U3)", "W(U4)"),
-        ("L1", "L(U1)", "L(U2)"),
-        ("L2", "L(U3)", "L(U4)"),
-        ("L3", "W(L1)", "L(U5)"),
-        ("L4", "W(L2)", "L(U6)"),
-        ("L5", "W(L3)", "W(L4)"),
-        ("U7", "W(U5)", "W(U6)"),
-        ("L6", "W(L5)", "L(U7)"),
-        ("GF", "W(U7)", "W(L6)")
-    ]
-    TOTAL_MATCHES = len(AGENDA_MANUAL)  # 14
+    # ── Entradas do plano: cabeças (S1–S4) e adversários (T1–T4) ──
+    entradas = ["G2", "XLG", "FNC", "RRQ"] + opponents
+    TOTAL_MATCHES = PLANO.n_jogos  # 14
 
     # ─────── Estado inicial ───────
     if "choices" not in st.session_state:
@@ -283,7 +250,7 @@ def simulador_manual():
             if st.session_state.order:
                 last_mid = st.session_state.order.pop()
                 st.session_state.choices.pop(last_mid, None)
-                w, l, p = rebuild_from_choices(st.session_state.choices, AGENDA_MANUAL)
+                w, l, p = rebuild_from_choices(st.session_state.choices, entradas)
                 st.session_state.winners = w
                 st.session_state.losers  = l
                 st.session_state.prob    = p
@@ -300,7 +267,8 @@ def simulador_manual():
 
 
     # ─────── Loop das partidas ───────
-    for mid, A, B in AGENDA_MANUAL:
+    vagas = vagas_do_estado(entradas, st.session_state.winners, st.session_state.losers)
+    for k, mid in enumerate(PLANO.ids):
         fase_nome = PHASE_DISPLAY[mid]
 
         if mid in st.session_state.choices:
@@ -308,15 +276,14 @@ def simulador_manual():
                      [st.session_state.choices[mid]], index=0, disabled=True)
             continue
 
-        a = resolve_choice(A, st.session_state.winners, st.session_state.losers)
-        b = resolve_choice(B, st.session_state.winners, st.session_state.losers)
+        a, b = PLANO.confronto(vagas, k)
 
         if not (a and b):
             st.radio(f"{fase_nome}: (aguardando…)", ["—"], index=0, disabled=True)
             continue
 
         # Probabilidade pré-jogo
-        p_a = 1 / (1 + 10 ** ((elos[b] - elos[a]) / 400))
+        p_a = modelo.p(a, b)
         p_b = 1 - p_a
 
         # texto mostrado no tooltip
@@ -354,48 +321,114 @@ def simulador_manual():
     st.success(f"Probabilidade do caminho: "
                f"{st.session_state.get('prob', 1) * 100:.4f}%")
 
-# ─────────────────────────── Interface ───────────────────────
-df, equipes = load_data()
+    # ─────── Chances condicionais às escolhas (exatas) ───────
+    cabecas = ["G2", "XLG", "FNC", "RRQ"]
+    with inst.span("probabilidades_condicionais"):
+        tally = probabilidades_condicionais(
+            modelo.P, modelo.indices(cabecas), modelo.indices(opponents),
+            {mid: modelo.indice[t] for mid, t in st.session_state.winners.items()})
+    cond = pd.DataFrame(tally * 100, index=modelo.times, columns=FASES)
+    cond = cond.loc[cabecas + opponents].sort_values(FASES[::-1], ascending=False)
+    st.markdown("#### Chances de cada time, dadas as escolhas até aqui")
+    st.dataframe(cond, width="stretch", column_config={
+        f: st.column_config.NumberColumn(format="%.2f%%") for f in FASES})
+
+# ────────────────── Caminhos e bracket ──────────────────────
+def caminhos_e_bracket(df, equipes, indice):
+    with st.sidebar:
+        escolha = st.selectbox("Equipe campeã", ["Todos"] + equipes)
+        modo    = st.radio("Filtro de cenário",
+                           ["Mais provável", "Menos provável", "Mostrar todos"])
+        if modo == "Mostrar todos":
+            ordem = st.radio("Ordenar por", ["Mais prováveis", "Menos prováveis"],
+                             horizontal=True)
+            qtde  = st.selectbox("Mostrar", [50, 100, 200, 300], index=0)
+        else:
+            ordem, qtde = None, 50
+
+    with inst.span("filtro"):
+        if indice is None:
+            menos  = modo == "Menos provável" or ordem == "Menos prováveis"
+            try:
+                filtro = busca_cenarios(qtde if modo == "Mostrar todos" else 1, escolha, menos,
+                                        hash_elo(modelo.elos))
+            except BuscaInterrompida as erro:
+                st.error(f"Cenários indisponíveis: {erro}")
+                return
+            total  = len(filtro)
+        else:
+            posicoes = indice[escolha]             # decrescente por probabilidade
+            if modo == "Mais provável":
+                posicoes = posicoes[:1]
+            elif modo == "Menos provável":
+                posicoes = posicoes[-1:]
+            elif ordem == "Menos prováveis":
+                posicoes = posicoes[::-1]
+            filtro = df.iloc[posicoes[:qtde]]
+            total  = len(posicoes)
+
+    st.subheader(f"Caminhos encontrados: {total:,}")
+    if indice is None:
+        origem = f"Ratings de {data_ratings:%d/%m/%Y}" if passado else "Sem caminhos.parquet"
+        st.caption(f"{origem}: cenários calculados por busca direta na chave.")
+
+    with inst.span("lista"):
+        for i, (_, row) in enumerate(filtro.iterrows(), 1):
+            perm, mascara = int(row["perm"]), int(row["mascara"])
+            st.markdown(f"### 🏆 **{row['campeao']}** — {row['probabilidade']*100:.4f}%")
+            st.code("\n".join(linhas_caminho(perm, mascara, modelo.P)))
+            if st.button(f"📊 Ver bracket {i}", key=f"btn{i}"):
+                plot_bracket(perm, mascara)
+            st.markdown("---")
+        inst.contar("caminhos_exibidos", len(filtro))
+
+# ───────────────────── Painel de desempenho ──────────────────
+def painel_debug():
+    rel = inst.despejar()                  # uma linha JSON por execução
+    mem = f"{rel['memoria_mb']:.0f} MB" if rel["memoria_mb"] is not None else "—"
+    with st.sidebar.expander("🛠️ Tempos desta execução", expanded=True):
+        st.caption(f"Total: {rel['total_ms']:.1f} ms · memória: {mem}")
+        st.dataframe(pd.DataFrame(rel["spans"]).round(2), hide_index=True,
+                     width="stretch")
+        if rel["contadores"]:
+            st.json(rel["contadores"])
+        st.download_button("Baixar tempos (JSON)",
+                           json.dumps(rel, ensure_ascii=False, indent=2),
+                           file_name="tempos.json", mime="application/json")
 
+# ─────────────────────────── Interface ───────────────────────
 with st.sidebar:
     aba = st.radio("📌 Seção", ["🏆 Caminhos e Bracket",
                                 "📊 Estatísticas por fase",
                                 "🧱​ Simulador manual"])
+    # projeções com os ratings de uma data passada (histórico de Elo)
+    data_ratings = passado = None
+    if os.path.exists(HISTORICO):
+        hist = ler_historico()
+        data_ratings = st.date_input("📅 Ratings em", value=hist.ultima_data.date(),
+                                     min_value=hist.primeira_data.date(),
+                                     max_value=hist.ultima_data.date())
+        passado = data_ratings < hist.ultima_data.date()
+    debug = st.toggle("🛠️ Painel de desempenho", value=False)
+
+if passado:               # caminhos.parquet e agregados valem só para os ratings atuais
+    modelo = carregar_em(data_ratings)
+    elos   = modelo.elos
+
+# desligada, a instrumentação não mede nada (custo desprezível)
+inst = Instrumentacao(ativo=debug, rotulo=aba)
+
+with inst.span("load_data"):
+    df, equipes, indice = (None, sorted(TIMES), None) if passado else load_data()
 
 if aba == "🧱​ Simulador manual":
-    simulador_manual()
-    st.stop()
-
-if aba == "📊 Estatísticas por fase":
-    estatisticas_fase()
-    st.stop()
-
-# -------- Caminhos e bracket --------
-with st.sidebar:
-    escolha = st.selectbox("Equipe campeã", ["Todos"] + equipes)
-    modo    = st.radio("Filtro de cenário",
-                       ["Mais provável", "Menos provável", "Mostrar todos"])
-    if modo == "Mostrar todos":
-        ordem = st.radio("Ordenar por", ["Mais prováveis", "Menos prováveis"],
-                         horizontal=True)
-        qtde  = st.selectbox("Mostrar", [50, 100, 200, 300], index=0)
-    else:
-        ordem, qtde = None, 50
-
-filtro = df if escolha == "Todos" else df[df["campeao_clean"] == escolha]
-if modo == "Mais provável":
-    filtro = filtro.nlargest(1, "probabilidade")
-elif modo == "Menos provável":
-    filtro = filtro.nsmallest(1, "probabilidade")
-elif modo == "Mostrar todos":
-    filtro = filtro.sort_values("probabilidade",
-                                ascending=(ordem == "Menos prováveis"))
-
-st.subheader(f"Caminhos encontrados: {len(filtro):,}")
-
-for i, (_, row) in enumerate(filtro.head(qtde).iterrows(), 1):
-    st.markdown(f"### 🏆 **{row['campeao']}** — {row['probabilidade']*100:.4f}%")
-    st.code("\n".join(row["caminho"]))
-    if st.button(f"📊 Ver bracket {i}", key=f"btn{i}"):
-        plot_bracket(row["caminho"])
-    st.markdown("---")
+    with inst.span("simulador_manual"):
+        simulador_manual()
+elif aba == "📊 Estatísticas por fase":
+    with inst.span("estatisticas_fase"):
+        estatisticas_fase()
+else:
+    caminhos_e_bracket(df, equipes, indice)
+
+if debug:
+    painel_debug()
@@ -0,0 +1,163 @@
+"""
+Custo por nó do enumerador de caminhos: antes × depois
+Mantém, só como referência, o núcleo original de simulador_caminhos,
+igual ao da primeira versão do script: um Estado com dicionários e a
+lista `hist` clonados a cada filho, uma linha de histórico formatada por
+nó, fontes "W(U1)" resolvidas por texto e agenda reescaneada a cada passo.
+Os dois núcleos rodam sobre as 24 permutações com a saída descartada
+(a versão original montava um JSON; a atual grava Parquet), para isolar
+a busca da gravação. O custo por nó divide o tempo pelo número de
+estados que a busca original visita (o mesmo para as duas versões).
+Antes de medir, confere que ambas geram os mesmos caminhos, na mesma
+ordem e com as mesmas probabilidades.
+Gera: nada (tabela impressa)
+"""
+
+from __future__ import annotations
+import statistics, time
+from dataclasses import dataclass, field, replace
+from typing import Dict, List, Tuple
+import simulador_caminhos as sc
+from codificacao_caminhos import BIT, FIXOS, INDICE, PERMUT
+from plano_chave import PLANO
+from probabilidades import carregar
+
+# ── 0. Configuração ───────────────────────────────────────────
+repeticoes = 3                # execuções por versão (vale a mediana)
+
+elos = carregar().elos
+
+def prob(a: str, b: str) -> float:
+    return 1 / (1 + 10 ** ((elos[b] - elos[a]) / 400))
+
+# ── 1. Núcleo original (referência) ───────────────────────────
+@dataclass
+class Estado:
+    W: Dict[str, str] = field(default_factory=dict)      # vencedor por id
+    L: Dict[str, str] = field(default_factory=dict)      # perdedor  por id
+    derrotas: Dict[str, int] = field(default_factory=dict)
+    hist: List[str] = field(default_factory=list)
+    p: float = 1.0
+    fim: bool = False
+    campeao: str | None = None
+
+    def clone(self) -> "Estado":
+        return replace(self,
+                       W=self.W.copy(),
+                       L=self.L.copy(),
+                       derrotas=self.derrotas.copy(),
+                       hist=self.hist[:])
+
+def resolve(src: str, st: Estado) -> str:
+    if src in elos:                 # time fixo
+        return src
+    tag, mid = src[0], src[2:-1]    # W(U1) → tag=W, mid=U1
+    return (st.W if tag == "W" else st.L)[mid]
+
+def proxima(st: Estado, agenda):
+    for mid, A, B in agenda:
+        if mid not in st.W:
+            try:
+                a, b = resolve(A, st), resolve(B, st)
+            except KeyError:
+                return None
+            if st.derrotas.get(a,0) < 2 and st.derrotas.get(b,0) < 2:
+                return mid, a, b
+    return None
+
+def expandir(st: Estado, agenda) -> List[Estado]:
+    nxt = proxima(st, agenda)
+    if not nxt:
+        return []
+    mid, a, b = nxt
+    pa, pb = prob(a,b), 1 - prob(a,b)
+    filhos = []
+    for vencedor, perdedor, pv in ((a,b,pa), (b,a,pb)):
+        novo = st.clone()
+        novo.hist.append(f"{mid}: {vencedor} > {perdedor} ({pv:.2%})")
+        novo.p *= pv
+        novo.W[mid] = vencedor
+        novo.L[mid] = perdedor
+        novo.derrotas[perdedor] = novo.derrotas.get(perdedor,0) + 1
+        if mid == "GF":
+            novo.fim, novo.campeao = True, vencedor
+        filhos.append(novo)
+    return [f for f in filhos
+            if max(f.derrotas.values(), default=0) <= 2]
+
+def agenda_da_perm(perm) -> List[Tuple[str, str, str]]:
+    subs = dict(zip(PLANO.formato.entradas, FIXOS + list(perm)))
+    return [(mid,
+             subs.get(A, A),
+             subs.get(B, B)) for mid,A,B in PLANO.formato.partidas]
+
+def enumerar_original(i: int, saida) -> int:
+    """Busca original da permutação i; devolve o número de estados visitados."""
+    agenda = agenda_da_perm(PERMUT[i])
+    pilha = [Estado(derrotas={t:0 for t in FIXOS+list(PERMUT[i])})]
+    nos = 0
+    while pilha:
+        est = pilha.pop()
+        nos += 1
+        if est.fim:
+            saida.folha(i, est, agenda)
+        else:
+            pilha.extend(expandir(est, agenda))
+    return nos
+
+def mascara_do_estado(est: Estado, agenda) -> int:
+    """Máscara (bit k = 1 → 2º time venceu) de um estado final da busca original."""
+    return sum(1 << BIT[mid] for mid, _, B in agenda if est.W[mid] == resolve(B, est))
+
+# ── 2. Escritores em memória ──────────────────────────────────
+class Descarte:
+    """Aceita as linhas e não faz nada: mede só a busca."""
+    def folha(self, perm, est, agenda):
+        pass
+
+    def adicionar_lote(self, perm, mascaras, probs, campeoes):
+        pass
+
+class Coleta:
+    """Guarda as linhas para comparar as duas versões."""
+    def __init__(self):
+        self.linhas: List[tuple] = []
+
+    def folha(self, perm, est, agenda):
+        self.linhas.append((perm, mascara_do_estado(est, agenda), est.p, INDICE[est.campeao]))
+
+    def adicionar_lote(self, perm, mascaras, probs, campeoes):
+        self.linhas += zip([perm] * len(mascaras), mascaras, probs, campeoes)
+
+# ── 3. Medição ────────────────────────────────────────────────
+def original(saida) -> int:
+    return sum(enumerar_original(i, saida) for i in range(len(PERMUT)))
+
+def atual(saida):
+    for i, k, prefixo in sc.unidades(0):
+        sc.enumerar(i, k, prefixo, saida)
+
+def medir(fn) -> float:
+    tempos = []
+    for _ in range(repeticoes):
+        t = time.perf_counter()
+        fn(Descarte())
+        tempos.append(time.perf_counter() - t)
+    return statistics.median(tempos)
+
+def main():
+    a, b = Coleta(), Coleta()
+    nos = original(a)
+    atual(b)
+    if a.linhas != b.linhas:
+        raise SystemExit("As duas versões geraram caminhos diferentes")
+    print(f"{len(a.linhas):,} caminhos idênticos; {nos:,} nós visitados")
+
+    t_antes, t_depois = medir(original), medir(atual)
+    print(f"\n{'versão':<10} {'tempo (s)':>10} {'µs/nó':>8}")
+    for nome, t in (("original", t_antes), ("atual", t_depois)):
+        print(f"{nome:<10} {t:>10.3f} {t / nos * 1e6:>8.2f}")
+    print(f"\nRedução do custo por nó: {t_antes / t_depois:.1f}×")
+
+if __name__ == "__main__":
+    main()
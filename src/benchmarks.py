@@ -0,0 +1,251 @@
+"""
+Benchmarks dos caminhos quentes
+Mede, com dados sintéticos em várias escalas, a enumeração de caminhos
+e a busca dos K cenários mais prováveis, o motor Monte Carlo (serial,
+em paralelo e adaptativo, e o cálculo exato por fase, também em lote),
+a recorrência de Elo, a leitura + filtros do app e a renderização do
+bracket. Cada execução
+é gravada em JSON e comparada com a baseline guardada; casos cuja
+mediana piorar mais que `limite_regressao` são marcados como regressão.
+A baseline vale só para a máquina em que foi gravada: se CPUs ou versões
+(Python, NumPy, pandas) diferirem, a comparação é pulada com um aviso e
+cada máquina deve gravar a sua (`salvar_baseline = True`).
+Gera: benchmarks/<data-hora>.json (e benchmarks/baseline.json, se pedido)
+"""
+
+from __future__ import annotations
+import itertools, json, os, platform, statistics, subprocess, sys, tempfile, time
+from datetime import datetime
+from typing import Callable, Dict
+import numpy as np
+import pandas as pd
+
+import simulador_caminhos as sc
+from bracket_grafico import bytes_bracket, render_bracket
+from calculo_elo_completo import atualizar_elo, k_dinamico, preparar_partidas
+from cenarios_provaveis import melhores_cenarios
+from codificacao_caminhos import (EscritorCaminhos, indice_por_campeao,
+                                  ler_caminhos, reorganizar_por_campeao)
+from fases_exatas import (probabilidades_condicionais, probabilidades_fases,
+                          probabilidades_fases_lote)
+from motor_monte_carlo import (simular_adaptativo, simular_entradas, simular_paralelo,
+                               simular_permutacoes)
+from plano_chave import compilar, dupla_eliminacao
+from probabilidades import PERMUT, TIMES, matriz_probabilidades, prob_vitoria
+
+# ── 0. Configuração ───────────────────────────────────────────
+PASTA            = "benchmarks"
+BASELINE         = os.path.join(PASTA, "baseline.json")
+salvar_baseline  = False      # True: esta execução vira a nova baseline
+limite_regressao = 0.20       # mediana 20% acima da baseline = regressão
+AMBIENTE         = ("cpus", "python", "numpy", "pandas")   # precisam bater com a baseline
+repeticoes       = 5          # execuções por caso (após um aquecimento)
+tempo_max        = 5.0        # segundos por caso; casos lentos repetem menos
+semente          = 0
+
+ESCALAS_TIMES      = [8, 16, 32]
+ESCALAS_SIMULACOES = [10**2, 10**3, 10**4, 10**5, 10**6]
+ESCALAS_PARTIDAS   = [10**3, 10**5]
+ESCALAS_CAMINHOS   = [10**4, 10**5, 393_216]
+TOP_K              = 10       # cenários pedidos à busca best-first
+TOLERANCIA         = 0.005    # modo adaptativo (±0,5 p.p. com 95%)
+MATRIZES_LOTE      = 1_000    # vetores de ratings do cálculo exato em lote
+ESCALAS_PROCESSOS  = sorted({1, os.cpu_count() or 1})  # modo paralelo, 10⁶ simulações
+# Limites de viabilidade: a enumeração completa só cabe na chave de 8
+# (16 times já têm 2^30 folhas por sorteio) e o cálculo exato até 16
+MAX_TIMES_ENUMERACAO = 8
+MAX_TIMES_EXATO      = 16
+
+# ── 1. Dados sintéticos ───────────────────────────────────────
+def nomes_sinteticos(n: int):
+    """Os 8 times reais primeiro (o Elo filtra por eles), depois S08, S09..."""
+    return TIMES[:n] + [f"S{i:02d}" for i in range(len(TIMES), n)]
+
+def elos_sinteticos(n: int, rng) -> Dict[str, float]:
+    return dict(zip(nomes_sinteticos(n), 1500 + 100 * rng.standard_normal(n)))
+
+def partidas_sinteticas(n_times: int, n_partidas: int, rng) -> pd.DataFrame:
+    nomes = np.array(nomes_sinteticos(n_times))
+    a = rng.integers(n_times, size=n_partidas)
+    b = (a + rng.integers(1, n_times, size=n_partidas)) % n_times
+    df = pd.DataFrame({
+        "data": pd.Timestamp("2025-01-01") + pd.to_timedelta(np.arange(n_partidas), "h"),
+        "time_a": nomes[a], "time_b": nomes[b],
+        "vencedor": np.where(rng.random(n_partidas) < 0.5, nomes[a], nomes[b]),
+    })
+    for i in range(1, 4):
+        perdedor = rng.integers(0, 13, size=n_partidas)
+        a_vence = rng.random(n_partidas) < 0.5
+        df[f"rounds_time_a_mapa_{i}"] = np.where(a_vence, 13, perdedor)
+        df[f"rounds_time_b_mapa_{i}"] = np.where(a_vence, perdedor, 13)
+    return df
+
+def caminhos_sinteticos(n: int, destino: str, rng):
+    """Parquet no formato de caminhos.parquet (já reorganizado por campeão)."""
+    bruto = destino + ".bruto"
+    perm = rng.integers(len(PERMUT), size=n)
+    with EscritorCaminhos(bruto) as saida:
+        for i in range(len(PERMUT)):
+            sel = perm == i
+            saida.adicionar_lote(i, rng.integers(1 << 14, size=sel.sum()).tolist(),
+                                 rng.dirichlet(np.ones(sel.sum())).tolist(),
+                                 rng.integers(len(TIMES), size=sel.sum()).tolist())
+    reorganizar_por_campeao(bruto, destino)
+    os.remove(bruto)
+
+# ── 2. Medição ────────────────────────────────────────────────
+def medir(fn: Callable[[], object]) -> Dict[str, float]:
+    fn()                                            # aquecimento
+    tempos, inicio = [], time.perf_counter()
+    while len(tempos) < repeticoes and (not tempos or time.perf_counter() - inicio < tempo_max):
+        t = time.perf_counter()
+        fn()
+        tempos.append(time.perf_counter() - t)
+    return {"mediana_s": statistics.median(tempos), "min_s": min(tempos),
+            "execucoes": len(tempos)}
+
+def inviavel(n_times: int) -> Dict[str, str]:
+    return {"ignorado": f"inviável com {n_times} times"}
+
+# ── 3. Casos ──────────────────────────────────────────────────
+def casos(pasta: str, rng) -> Dict[str, object]:
+    """Nome → função a medir (ou dict com o motivo de o caso ser ignorado)."""
+    c: Dict[str, object] = {}
+
+    for n in ESCALAS_TIMES:
+        elos = elos_sinteticos(n, rng)
+        P = matriz_probabilidades(elos, list(elos))
+        plano = compilar(dupla_eliminacao(n))
+        S, T = list(range(n // 2)), list(range(n // 2, n))
+        if n == 8:        # como nos scripts: sorteio dos adversários (24 permutações)
+            exato = lambda P=P, S=S, T=T: probabilidades_fases(P, S, T)
+            mc = lambda sims, P=P, S=S, T=T: simular_permutacoes(
+                P, S, T, max(sims // len(PERMUT), 1), semente)
+        else:             # confrontos iniciais fixos, mesmo plano genérico
+            exato = lambda P=P, S=S, T=T, pl=plano: probabilidades_condicionais(P, S, T, {}, pl)
+            mc = lambda sims, P=P, pl=plano: simular_entradas(
+                P, range(pl.n_entradas), sims, semente, pl)
+
+        if n <= MAX_TIMES_ENUMERACAO:
+            def enumeracao(P=P):
+                anterior, sc.P = sc.P, P.tolist()  # a DFS lê a matriz do módulo
+                try:
+                    with EscritorCaminhos(os.path.join(pasta, "enum.parquet")) as saida:
+                        for i, k, prefixo in sc.unidades(0):
+                            sc.enumerar(i, k, prefixo, saida)
+                finally:
+                    sc.P = anterior
+            c[f"enumeracao/times={n}"] = enumeracao
+        else:
+            c[f"enumeracao/times={n}"] = inviavel(n)
+        c[f"fases_exatas/times={n}"] = exato if n <= MAX_TIMES_EXATO else inviavel(n)
+        raizes = [S + list(p) for p in itertools.permutations(T)] if n == 8 else [S + T]
+        c[f"top_k/times={n}/k={TOP_K}"] = lambda P=P, rz=raizes, pl=plano: list(
+            melhores_cenarios(P, rz, TOP_K, pl))
+        for s in ESCALAS_SIMULACOES:
+            c[f"monte_carlo/times={n}/sims={s}"] = lambda mc=mc, s=s: mc(s)
+        variaveis = T if n == 8 else []           # demais: confrontos fixos
+        c[f"monte_carlo_adaptativo/times={n}/tol={TOLERANCIA}"] = \
+            lambda P=P, S=S, T=T, V=variaveis, pl=plano: simular_adaptativo(
+                P, S if V else S + T, V, TOLERANCIA, rng=semente, plano=pl)
+        if n == 8:
+            ruido = np.random.default_rng(semente).standard_normal((MATRIZES_LOTE, n))
+            R = np.array(list(elos.values())) + 25 * ruido
+            Ps = prob_vitoria(R[:, :, None], R[:, None, :])
+            c[f"fases_exatas_lote/matrizes={MATRIZES_LOTE}"] = \
+                lambda Ps=Ps, S=S, T=T: probabilidades_fases_lote(Ps, S, T)
+            for proc in ESCALAS_PROCESSOS:
+                c[f"monte_carlo_paralelo/processos={proc}"] = lambda P=P, S=S, T=T, proc=proc: \
+                    simular_paralelo(P, S, T, 10**6 // len(PERMUT), semente, proc)
+
+        for m in ESCALAS_PARTIDAS:                 # como no script, só partidas
+            df = partidas_sinteticas(n, m, rng)        # com algum time do campeonato
+            def replay(df=df):
+                partidas = preparar_partidas(df)
+                ratings = np.full(len(partidas.nomes), 1500.0)
+                atualizar_elo(partidas, ratings, k_dinamico(partidas.delta, partidas.prorroga))
+            c[f"elo_replay/times={n}/partidas={m}"] = replay
+
+    for n in ESCALAS_CAMINHOS:
+        arq = os.path.join(pasta, f"caminhos_{n}.parquet")
+        caminhos_sinteticos(n, arq, rng)
+        colunas = ["perm", "mascara", "probabilidade", "campeao"]
+        def load_data(arq=arq):
+            df = ler_caminhos(arq, colunas=colunas)
+            return df, indice_por_campeao(df)
+        df, indice = load_data()
+        def filtro(df=df, indice=indice):
+            # as seleções da barra lateral: campeão × modo × ordem, 50 linhas
+            for pos in indice.values():
+                for sel in (pos[:1], pos[-1:], pos[:50], pos[::-1][:50]):
+                    df.iloc[sel]
+        c[f"load_data/caminhos={n}"] = load_data
+        c[f"filtro/caminhos={n}"] = filtro
+
+    for fmt in ("png", "pdf"):
+        c[f"plot_bracket/{fmt}"] = lambda fmt=fmt: bytes_bracket(0, 0, fmt)
+    c["plot_bracket/cache"] = lambda: render_bracket(0, 0, "png")
+    return c
+
+# ── 4. Execução e comparação ──────────────────────────────────
+def metadados() -> Dict[str, object]:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"],
+                                capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = ""
+    return {"data": datetime.now().isoformat(timespec="seconds"), "commit": commit,
+            "python": platform.python_version(), "numpy": np.__version__,
+            "pandas": pd.__version__, "plataforma": platform.platform(),
+            "cpus": os.cpu_count(), "semente": semente}
+
+def ambiente_diferente(atual: Dict[str, object], base: Dict[str, object]) -> list:
+    """Campos de AMBIENTE em que a baseline difere desta execução."""
+    return [f"{c}: {base.get(c)} → {atual.get(c)}" for c in AMBIENTE if base.get(c) != atual.get(c)]
+
+def comparar(atual: Dict[str, dict], base: Dict[str, dict]) -> list:
+    """Casos com mediana acima de (1 + limite_regressao) × baseline."""
+    regressoes = []
+    for nome, r in atual.items():
+        b = base.get(nome, {})
+        if "mediana_s" in r and "mediana_s" in b:
+            r["razao_baseline"] = r["mediana_s"] / b["mediana_s"]
+            if r["razao_baseline"] > 1 + limite_regressao:
+                regressoes.append(nome)
+    return regressoes
+
+def main():
+    rng = np.random.default_rng(semente)
+    os.makedirs(PASTA, exist_ok=True)
+    resultados: Dict[str, dict] = {}
+    with tempfile.TemporaryDirectory() as pasta:
+        for nome, fn in casos(pasta, rng).items():
+            if isinstance(fn, dict):
+                resultados[nome] = fn
+                continue
+            resultados[nome] = medir(fn)
+            print(f"{nome:<42} {resultados[nome]['mediana_s'] * 1e3:>11.3f} ms")
+
+    regressoes, meta = [], metadados()
+    if os.path.exists(BASELINE):
+        with open(BASELINE, encoding="utf-8") as f:
+            base = json.load(f)
+        if diferencas := ambiente_diferente(meta, base["meta"]):
+            print(f"\nBaseline de outro ambiente ({'; '.join(diferencas)}); comparação "
+                  "pulada. Grave a baseline desta máquina com salvar_baseline = True.")
+        else:
+            regressoes = comparar(resultados, base["casos"])
+    saida = {"meta": meta, "limite_regressao": limite_regressao,
+             "casos": resultados, "regressoes": regressoes}
+    arquivo = os.path.join(PASTA, datetime.now().strftime("%Y%m%d-%H%M%S") + ".json")
+    for destino in [arquivo] + ([BASELINE] if salvar_baseline else []):
+        with open(destino, "w", encoding="utf-8") as f:
+            json.dump(saida, f, ensure_ascii=False, indent=2)
+    print(f"\nResultados em {arquivo}")
+
+    for nome in regressoes:
+        print(f"REGRESSÃO: {nome} ({resultados[nome]['razao_baseline']:.2f}× a baseline)")
+    return 1 if regressoes else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,111 @@
+"""
+Desenho do bracket (independente do Streamlit)
+Logos são decodificados uma vez por processo e cada bracket renderizado
+fica em um LRU limitado, com chave (perm, máscara, formato, data e hash
+dos ratings usados), então regravar os ratings não serve imagem velha. As figuras
+usam a API orientada a objetos do Matplotlib (sem pyplot), então podem
+ser geradas fora da thread do script, como nos downloads sob demanda.
+"""
+
+from __future__ import annotations
+import io, os
+from functools import lru_cache
+import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
+from matplotlib.offsetbox import OffsetImage, AnnotationBbox
+from matplotlib.patches import Rectangle
+from cache_resultados import hash_elo
+from codificacao_caminhos import info_bracket
+from probabilidades import carregar, carregar_em
+
+LOGOS             = "logos"
+BRACKETS_EM_CACHE = 64        # imagens (perm, máscara, formato, data, ratings) mantidas
+
+# ─────────────────── Constantes visuais ──────────────────────
+BOX_W, BOX_H = 2.6, 1.5
+GAP_X, DY    = 0.28, 0.40
+ZOOM         = 0.08
+
+# ─────────────────── Layout fixo do bracket ──────────────────
+COL = {"qf": -0.2, "sf": 2.6, "uf": 5.4, "gf": 8.2}
+POS = {
+    "U1": (COL["qf"], 10), "U2": (COL["qf"],  8),
+    "U3": (COL["qf"],  6), "U4": (COL["qf"],  4),
+    "U5": (COL["sf"],  9), "U6": (COL["sf"],  5),
+    "U7": (COL["uf"],  7),
+    "L1": (COL["qf"],  1.5), "L2": (COL["qf"], -0.5),
+    "L3": (COL["sf"],  1.5), "L4": (COL["sf"], -0.5),
+    "L5": (COL["uf"],  0.5), "L6": (COL["gf"],  1.5),
+    "GF": (COL["gf"],  7),
+}
+LABEL_PAD = 0.25
+PHASE_TO_TOP = {
+    "Upper Quarterfinals": "U1",
+    "Upper Semifinals":    "U5",
+    "Upper Final":         "U7",
+    "Grand Final":         "GF",
+    "Lower Round 1":       "L1",
+    "Lower Round 2":       "L3",
+    "Lower Round 3":       "L5",
+    "Lower Final":         "L6",
+}
+PHASE_LABELS = {
+    lbl: (POS[mid][0], POS[mid][1] + BOX_H/2 + LABEL_PAD)
+    for lbl, mid in PHASE_TO_TOP.items()
+}
+
+# ───────────────────────── Logos ─────────────────────────────
+@lru_cache(maxsize=None)
+def logo_img(team: str):
+    """Imagem decodificada do logo (None se não houver arquivo)."""
+    f = os.path.join(LOGOS, f"{team}.png")
+    return plt.imread(f) if os.path.exists(f) else None
+
+def logo(team: str, zoom: float = ZOOM):
+    # um OffsetImage novo por artista; o array decodificado é compartilhado
+    img = logo_img(team)
+    return OffsetImage(img, zoom=zoom) if img is not None else None
+
+def draw_box(ax, x, y, win, lose, prob):
+    ax.add_patch(Rectangle((x, y-BOX_H/2), BOX_W, BOX_H,
+                           fc="white", ec="black"))
+    if (img := logo(win)):
+        ax.add_artist(AnnotationBbox(img, (x+0.15, y+DY), frameon=False))
+    ax.text(x+0.15+GAP_X, y+DY, win, weight="bold", va="center", fontsize=8)
+    ax.text(x+BOX_W-0.30, y+DY, f"{prob:.0f}%",
+            ha="right", va="center", fontsize=8)
+    ax.text(x+BOX_W-0.10, y+DY, "✔", color="green",
+            ha="right", va="center")
+    if (img2 := logo(lose)):
+        ax.add_artist(AnnotationBbox(img2, (x+0.15, y-DY), frameon=False))
+    ax.text(x+0.15+GAP_X, y-DY, lose, va="center", fontsize=8)
+
+# ─────────────────────── Bracket ─────────────────────────────
+def figura_bracket(perm: int, mascara: int, data_ratings=None) -> Figure:
+    # None = ratings atuais; uma data usa os ratings do histórico (ver historico_elo)
+    modelo = carregar() if data_ratings is None else carregar_em(data_ratings)
+    info = info_bracket(perm, mascara, modelo.P)
+    fig = Figure(figsize=(13, 7))
+    ax = fig.subplots()
+    ax.axis("off"); ax.set_xlim(-0.5, 11); ax.set_ylim(-2.5, 12)
+    for lbl, (x, y) in PHASE_LABELS.items():
+        ax.text(x+BOX_W/2, y, lbl, ha="center", weight="bold", fontsize=11)
+    for mid, (x, y) in POS.items():
+        if mid in info: draw_box(ax, x, y, *info[mid])
+    return fig
+
+def bytes_bracket(perm: int, mascara: int, fmt: str = "png", data_ratings=None) -> bytes:
+    """Bytes da imagem do bracket no formato pedido ("png" ou "pdf"), com os ratings de `data_ratings`."""
+    buf = io.BytesIO()                      # dpi de st.pyplot, usado antes
+    figura_bracket(perm, mascara, data_ratings).savefig(buf, format=fmt, dpi=200,
+                                          bbox_inches="tight")
+    return buf.getvalue()
+
+def render_bracket(perm: int, mascara: int, fmt: str = "png", data_ratings=None) -> bytes:
+    """bytes_bracket em cache, com os ratings em uso na chave."""
+    modelo = carregar() if data_ratings is None else carregar_em(data_ratings)
+    return _render_bracket(perm, mascara, fmt, data_ratings, hash_elo(modelo.elos))
+
+@lru_cache(maxsize=BRACKETS_EM_CACHE)
+def _render_bracket(perm: int, mascara: int, fmt: str, data_ratings, ratings: str) -> bytes:
+    return bytes_bracket(perm, mascara, fmt, data_ratings)
@@ -0,0 +1,91 @@
+"""
+Cache persistente de resultados (tabelas + imagens renderizadas)
+LRU em memória na frente de um diretório em disco que sobrevive a
+reinícios do app; os dois níveis têm limite de entradas e descartam
+as menos usadas. Chaves são hashes dos insumos (tabela de Elo, método,
+número de simulações, semente...).
+"""
+
+from __future__ import annotations
+import hashlib, os, pickle, tempfile
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Callable, Dict
+
+PASTA       = ".cache"
+MAX_MEMORIA = 16     # entradas por cache no processo
+MAX_DISCO   = 64     # arquivos por cache em disco
+
+# ── 1. Chaves ─────────────────────────────────────────────────
+def hash_elo(elos: Dict[str, float]) -> str:
+    """Hash estável da tabela de Elo (ordem das linhas não importa)."""
+    return chave(*sorted((t, float(r)) for t, r in elos.items()))
+
+def chave(*partes) -> str:
+    return hashlib.sha256(repr(partes).encode()).hexdigest()[:32]
+
+# ── 2. Cache de dois níveis ───────────────────────────────────
+class CacheResultados:
+    def __init__(self, pasta: str, max_memoria: int = MAX_MEMORIA,
+                 max_disco: int = MAX_DISCO):
+        self.pasta = pasta
+        self.max_memoria = max_memoria
+        self.max_disco = max_disco
+        self._memoria: "OrderedDict[str, Any]" = OrderedDict()
+        os.makedirs(pasta, exist_ok=True)
+
+    def _arquivo(self, k: str) -> str:
+        return os.path.join(self.pasta, f"{k}.pkl")
+
+    def obter(self, k: str):
+        """Valor guardado ou None; um acerto em disco sobe para a memória."""
+        if k in self._memoria:
+            self._memoria.move_to_end(k)
+            return self._memoria[k]
+        arq = self._arquivo(k)
+        try:
+            with open(arq, "rb") as f:
+                valor = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return None
+        os.utime(arq)                                   # marca uso recente
+        self._lembrar(k, valor)
+        return valor
+
+    def guardar(self, k: str, valor):
+        self._lembrar(k, valor)
+        fd, tmp = tempfile.mkstemp(dir=self.pasta, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump(valor, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, self._arquivo(k))               # gravação atômica
+        self._podar_disco()
+
+    def obter_ou_calcular(self, k: str, calcular: Callable[[], Any]):
+        valor = self.obter(k)
+        if valor is None:
+            valor = calcular()
+            self.guardar(k, valor)
+        return valor
+
+    def _lembrar(self, k: str, valor):
+        self._memoria[k] = valor
+        self._memoria.move_to_end(k)
+        while len(self._memoria) > self.max_memoria:
+            self._memoria.popitem(last=False)
+
+    def _podar_disco(self):
+        arqs = [os.path.join(self.pasta, a) for a in os.listdir(self.pasta)
+                if a.endswith(".pkl")]
+        if len(arqs) <= self.max_disco:
+            return
+        arqs.sort(key=os.path.getmtime)
+        for a in arqs[:len(arqs) - self.max_disco]:
+            try:
+                os.remove(a)
+            except OSError:
+                pass
+
+@lru_cache(maxsize=None)
+def cache(nome: str) -> CacheResultados:
+    """Uma instância por nome e por processo (sobrevive aos reruns do Streamlit)."""
+    return CacheResultados(os.path.join(PASTA, nome))
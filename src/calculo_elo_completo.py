@@ -1,97 +1,207 @@
-
+import hashlib
+import io
+import json
+import os
+from dataclasses import dataclass
+from typing import Dict, List
+import numpy as np
 import pandas as pd
-from collections import defaultdict
-
-# Função de ELO esperado
-def expected_score(elo_a, elo_b):
-    return 1 / (1 + 10 ** ((elo_b - elo_a) / 400))
-
-# Função para calcular delta de rounds total e verificar prorrogação
-def calcular_delta_rounds(row):
-    total_rounds_a = 0
-    total_rounds_b = 0
-    prorroga = False
+from historico_elo import HISTORICO, gravar_historico
 
-    for i in range(1, 6):
-        ra = row.get(f'rounds_time_a_mapa_{i}')
-        rb = row.get(f'rounds_time_b_mapa_{i}')
-        try:
-            ra = float(ra)
-            rb = float(rb)
-        except:
-            continue
+# ── Configuração ──────────────────────────────────────────────
+# "incremental": aplica só as partidas acrescentadas desde a última execução
+# "completo":    recalcula todo o histórico do zero
+modo = "incremental"
 
-        total_rounds_a += ra
-        total_rounds_b += rb
+PARTIDAS_CSV = "data/tabela_partidas_vlr.csv"
+ELO_CSV      = "data/elo_final_campeonato.csv"
+ESTADO_JSON  = "data/elo_estado.json"      # ratings atuais + marca d'água
 
-        if (ra >= 13 and rb >= 12) or (rb >= 13 and ra >= 12):
-            prorroga = True
-
-    delta = abs(total_rounds_a - total_rounds_b)
-    return delta, prorroga
+ELO_INICIAL = 1500.0
+BLOCO_MARCA = 4096            # bytes antes da marca d'água conferidos a cada execução
 
 # Lista dos 8 times do campeonato
 times_campeonato = ['G2', 'XLG', 'FNC', 'RRQ', 'SEN', 'MIBR', 'PRX', 'TH']
 
-# Ler arquivo CSV
-df = pd.read_csv("data/tabela_partidas_vlr.csv")
-df['data'] = pd.to_datetime(df['data'], errors='coerce')
-df = df.dropna(subset=['data'])
-df = df.sort_values('data')
-
-# Cálculo do ELO com K dinâmico
-elo_ratings = defaultdict(lambda: 1500.0)
-elo_history = []
-
-for _, row in df.iterrows():
-    team_a = row['time_a']
-    team_b = row['time_b']
-    winner = row['vencedor']
-
-    if team_a not in times_campeonato and team_b not in times_campeonato:
-        continue
-
-    delta, prorroga = calcular_delta_rounds(row)
-
-    if prorroga or delta < 10:
-        k_dinamico = 16
-    elif delta >= 25:
-        k_dinamico = 48
-    else:
-        k_dinamico = 32
-
-    elo_a = elo_ratings[team_a]
-    elo_b = elo_ratings[team_b]
-
-    expected_a = expected_score(elo_a, elo_b)
-    score_a = 1 if winner == team_a else 0
-
-    new_elo_a = elo_a + k_dinamico * (score_a - expected_a)
-    new_elo_b = elo_b + k_dinamico * ((1 - score_a) - (1 - expected_a))
-
-    elo_ratings[team_a] = new_elo_a
-    elo_ratings[team_b] = new_elo_b
-
-    elo_history.append({
-        'data': row['data'],
-        'team_a': team_a,
-        'team_b': team_b,
-        'winner': winner,
-        'delta_rounds': delta,
-        'prorroga': prorroga,
-        'k_usado': k_dinamico,
-        'elo_a_before': elo_a,
-        'elo_b_before': elo_b,
-        'elo_a_after': new_elo_a,
-        'elo_b_after': new_elo_b
+# ── Estágio colunar (tabela inteira de uma vez) ───────────────
+# Delta de rounds total e prorrogação por partida. Mesma regra da versão
+# linha a linha: mapas com valor não numérico são ignorados; mapas vazios
+# (NaN) propagam NaN no total, o que leva ao K padrão (32).
+def calcular_delta_rounds(df):
+    n = len(df)
+    total_a, total_b = np.zeros(n), np.zeros(n)
+    prorroga = np.zeros(n, dtype=bool)
+    for i in range(1, 6):
+        ca, cb = f'rounds_time_a_mapa_{i}', f'rounds_time_b_mapa_{i}'
+        if ca not in df or cb not in df:
+            continue
+        ra = pd.to_numeric(df[ca], errors='coerce').to_numpy(dtype=float)
+        rb = pd.to_numeric(df[cb], errors='coerce').to_numpy(dtype=float)
+        invalido = (np.isnan(ra) & df[ca].notna().to_numpy()) | \
+                   (np.isnan(rb) & df[cb].notna().to_numpy())
+        total_a += np.where(invalido, 0, ra)
+        total_b += np.where(invalido, 0, rb)
+        prorroga |= ~invalido & (((ra >= 13) & (rb >= 12)) | ((rb >= 13) & (ra >= 12)))
+    return np.abs(total_a - total_b), prorroga
+
+def k_dinamico(delta, prorroga, k=(16, 32, 48), limites=(10, 25)):
+    """K por partida: k[0] se prorrogação ou delta < limites[0], k[2] se delta >= limites[1]."""
+    with np.errstate(invalid='ignore'):
+        return np.select([prorroga | (delta < limites[0]), delta >= limites[1]],
+                         [k[0], k[2]], k[1]).astype(float)
+
+@dataclass
+class Partidas:
+    """Partidas relevantes em layout de arrays (times como índices inteiros)."""
+    nomes: List[str]          # nome por índice
+    data: np.ndarray          # datetime64
+    ia: np.ndarray            # índice do time A
+    ib: np.ndarray            # índice do time B
+    score_a: np.ndarray       # 1 se A venceu
+    delta: np.ndarray
+    prorroga: np.ndarray
+
+    def __len__(self):
+        return len(self.ia)
+
+def preparar_partidas(df, nomes: List[str] = ()) -> Partidas:
+    """Filtra as partidas com algum time do campeonato e as converte em arrays."""
+    df = df[df['time_a'].isin(times_campeonato) | df['time_b'].isin(times_campeonato)]
+    delta, prorroga = calcular_delta_rounds(df)
+    nomes = list(nomes)
+    nomes += [t for t in pd.unique(df[['time_a', 'time_b']].to_numpy().ravel())
+              if t not in nomes]
+    codigo = {t: i for i, t in enumerate(nomes)}
+    return Partidas(
+        nomes=nomes,
+        data=df['data'].to_numpy(),
+        ia=df['time_a'].map(codigo).to_numpy(dtype=np.intp),
+        ib=df['time_b'].map(codigo).to_numpy(dtype=np.intp),
+        score_a=(df['vencedor'] == df['time_a']).to_numpy(dtype=np.int8),
+        delta=delta,
+        prorroga=prorroga,
+    )
+
+# ── Recorrência sequencial (laço enxuto sobre listas) ─────────
+def atualizar_elo(partidas: Partidas, ratings: np.ndarray, k: np.ndarray) -> pd.DataFrame:
+    """Aplica as partidas em ordem, alterando `ratings` no lugar; retorna o histórico."""
+    r = ratings.tolist()
+    n = len(partidas)
+    antes_a, antes_b, depois_a, depois_b = [0.0] * n, [0.0] * n, [0.0] * n, [0.0] * n
+    for j, (a, b, s, kj) in enumerate(zip(partidas.ia.tolist(), partidas.ib.tolist(),
+                                          partidas.score_a.tolist(), k.tolist())):
+        elo_a, elo_b = r[a], r[b]
+        expected_a = 1 / (1 + 10 ** ((elo_b - elo_a) / 400))
+        r[a] = elo_a + kj * (s - expected_a)
+        r[b] = elo_b + kj * ((1 - s) - (1 - expected_a))
+        antes_a[j], antes_b[j], depois_a[j], depois_b[j] = elo_a, elo_b, r[a], r[b]
+    ratings[:] = r
+    nomes = np.array(partidas.nomes, dtype=object)
+    return pd.DataFrame({
+        'data': partidas.data,
+        'team_a': nomes[partidas.ia],
+        'team_b': nomes[partidas.ib],
+        'winner': np.where(partidas.score_a == 1, nomes[partidas.ia], nomes[partidas.ib]),
+        'delta_rounds': partidas.delta,
+        'prorroga': partidas.prorroga,
+        'k_usado': k.astype(int),
+        'elo_a_before': antes_a,
+        'elo_b_before': antes_b,
+        'elo_a_after': depois_a,
+        'elo_b_after': depois_b,
     })
 
-# Gerar tabela final com os 8 times
-elo_final = pd.DataFrame(
-    [(team, elo_ratings[team]) for team in times_campeonato],
-    columns=['time', 'elo_final']
-).sort_values(by='elo_final', ascending=False)
-
-# Salvar resultado
-elo_final.to_csv("data/elo_final_campeonato.csv", index=False)
-print(elo_final)
+# ── Leitura e estado persistido ───────────────────────────────
+# Lê as partidas a partir de um byte do CSV (0 = arquivo inteiro)
+def ler_partidas(inicio=0):
+    with open(PARTIDAS_CSV, "rb") as f:
+        cabecalho = f.readline()
+        f.seek(max(inicio, len(cabecalho)))
+        novos = f.read()
+        fim = f.tell()
+    df = pd.read_csv(io.BytesIO(cabecalho + novos))
+    linhas = len(df)
+    df['data'] = pd.to_datetime(df['data'], errors='coerce')
+    df = df.dropna(subset=['data'])
+    # estável: partidas do mesmo dia seguem a ordem do arquivo, então o modo
+    # incremental e o completo aplicam as partidas na mesma ordem
+    df = df.sort_values('data', kind='stable')
+    return df, fim, linhas
+
+# Hash do cabeçalho e dos últimos BLOCO_MARCA bytes antes do byte `n`:
+# custo fixo, independente do tamanho do histórico já processado
+def hash_marca(n):
+    with open(PARTIDAS_CSV, "rb") as f:
+        cabecalho = f.readline()
+        f.seek(max(n - BLOCO_MARCA, 0))
+        return hashlib.sha256(cabecalho + f.read(n - f.tell())).hexdigest()
+
+# Estado salvo da última execução (None se inexistente ou desatualizado)
+def carregar_estado():
+    if modo != "incremental" or not os.path.exists(ESTADO_JSON):
+        return None
+    if not os.path.exists(HISTORICO):            # histórico incompleto sem o anterior
+        return None
+    with open(ESTADO_JSON, encoding="utf-8") as f:
+        estado = json.load(f)
+    if os.path.getsize(PARTIDAS_CSV) < estado["marca"]["bytes"]:
+        print("Tabela de partidas encolheu desde a última execução; recalculando tudo.")
+        return None
+    if estado["marca"].get("hash") != hash_marca(estado["marca"]["bytes"]):
+        print("Partidas já processadas foram alteradas; recalculando tudo.")
+        return None
+    return estado
+
+def salvar_estado(elo_ratings: Dict[str, float], fim, linhas, ultima_data):
+    estado = {
+        "ratings": elo_ratings,
+        "marca": {"bytes": fim, "linhas": linhas, "hash": hash_marca(fim),
+                  "data": ultima_data.strftime("%Y-%m-%d") if ultima_data else None},
+    }
+    with open(ESTADO_JSON, "w", encoding="utf-8") as f:
+        json.dump(estado, f, ensure_ascii=False, indent=2)
+
+# ── Execução ──────────────────────────────────────────────────
+def main():
+    elo_ratings: Dict[str, float] = {}
+
+    estado = carregar_estado()
+    if estado:
+        df, fim, novas = ler_partidas(estado["marca"]["bytes"])
+        ultima_data = pd.Timestamp(estado["marca"]["data"]) if estado["marca"]["data"] else None
+        if ultima_data is not None and len(df) and df['data'].min() < ultima_data:
+            print("Partidas novas anteriores à marca d'água; recalculando tudo.")
+            estado = None
+        else:
+            elo_ratings.update(estado["ratings"])
+            linhas = estado["marca"]["linhas"] + novas
+            print(f"Modo incremental: {len(df)} partida(s) nova(s).")
+    if not estado:
+        df, fim, linhas = ler_partidas()
+        ultima_data = None
+
+    # Cálculo do ELO com K dinâmico
+    partidas = preparar_partidas(df, nomes=list(elo_ratings))
+    ratings = np.array([elo_ratings.get(t, ELO_INICIAL) for t in partidas.nomes])
+    k = k_dinamico(partidas.delta, partidas.prorroga)
+    elo_history = atualizar_elo(partidas, ratings, k)
+    elo_ratings = dict(zip(partidas.nomes, ratings.tolist()))
+    gravar_historico(elo_history, anexar=bool(estado))
+
+    if len(df):
+        ultima_data = max(df['data'].max(), ultima_data or df['data'].max())
+    salvar_estado(elo_ratings, fim, linhas, ultima_data)
+
+    # Gerar tabela final com os 8 times
+    elo_final = pd.DataFrame(
+        [(team, elo_ratings.get(team, ELO_INICIAL)) for team in times_campeonato],
+        columns=['time', 'elo_final']
+    ).sort_values(by='elo_final', ascending=False)
+
+    # Salvar resultado
+    elo_final.to_csv(ELO_CSV, index=False)
+    print(elo_final)
+    return elo_history
+
+if __name__ == "__main__":
+    main()
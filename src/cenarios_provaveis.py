@@ -0,0 +1,241 @@
+"""
+Cenários mais (ou menos) prováveis sem enumerar a árvore inteira
+Busca best-first sobre o plano da chave: cada nó é um prefixo de
+resultados, e a fila de prioridade é ordenada por um limite superior
+da probabilidade de qualquer cenário completo abaixo dele. Os cenários
+saem em ordem exata, e só nós cujo limite ainda supera o K-ésimo melhor
+cenário completo já visto são guardados. Funciona em chaves de 16 e 32
+times, onde a enumeração completa (simulador_caminhos) é inviável, mas o
+custo depende de quão parelhos são os ratings: com 32 times próximos um
+top-10 passa de 10^5 nós (minutos). Acima de `max_nos` a busca para com
+BuscaInterrompida.
+Gera: nada (usado pelo app quando data/caminhos.parquet não existe)
+"""
+
+from __future__ import annotations
+import heapq, itertools
+from typing import Iterator, List, NamedTuple, Optional, Sequence
+import numpy as np
+import pandas as pd
+from plano_chave import PLANO, Plano
+from probabilidades import FIXOS, INDICE, PERMUT, TIMES, carregar
+
+# ── 0. Configuração (execução como script) ────────────────────
+k_cenarios      = 10
+campeao         = None        # ex.: "G2"; None = qualquer campeão
+menos_provaveis = False
+
+ITERACOES_AJUSTE = 100        # passos de subgradiente na 1ª raiz (ver Limite.ajustar)
+ITERACOES_RAIZES = 10         # nas demais, partindo dos multiplicadores da anterior
+MAX_NOS          = 50_000     # nós retirados da fila antes de desistir (None = sem limite)
+
+class BuscaInterrompida(RuntimeError):
+    """A busca passou do limite de nós; os cenários já gerados continuam exatos."""
+
+class Cenario(NamedTuple):
+    probabilidade: float
+    raiz: int                 # índice em `raizes` (no campeonato, a permutação)
+    mascara: int              # bit k = 1 quando o segundo time da partida k vence
+    campeao: int              # índice em P
+
+# ── 1. Limite (relaxação lagrangiana) ─────────────────────────
+class Limite:
+    """
+    Maior (ou menor) log-probabilidade que os cenários completos abaixo
+    de um prefixo podem ter. Os vencedores formam uma árvore até a GF,
+    resolvida por programação dinâmica (time × vaga); o que a torna
+    difícil são as vagas de perdedor que seguem na chave (lower). Cada
+    uma vira uma cópia livre, e a igualdade "cópia = perdedor real" é
+    relaxada com multiplicadores `lam` (partida × time): com qualquer
+    `lam` o resultado é um limite válido, e `ajustar` o aperta.
+    """
+
+    def __init__(self, P: np.ndarray, plano: Plano, mais: bool):
+        self.plano, self.mais = plano, mais
+        self.LP = np.log(np.clip(P, 1e-300, None))
+        self.neutro = -np.inf if mais else np.inf          # time fora da vaga
+        self.copia = plano.rodada_do_perdedor < 0           # perdedor segue vivo
+        self.lam = np.zeros((plano.n_jogos, len(P)))
+
+    def _dp(self, vagas: list, j: int, rastro: bool = False):
+        pl, n = self.plano, len(self.LP)
+        e, m = pl.n_entradas, pl.n_jogos
+        arg = np.argmax if self.mais else np.argmin
+        V = np.full((pl.n_vagas, n), self.neutro)            # melhor valor por time na vaga
+        pode = np.zeros((pl.n_vagas, n), dtype=bool)
+        feitas = list(range(e)) + [e + i for i in range(j)] + [e + m + i for i in range(j)]
+        times = [vagas[s] for s in feitas]
+        V[feitas, times], pode[feitas, times] = 0.0, True
+        escolhas = {}
+        for i in range(j, m):
+            sa, sb = pl.fontes[i]
+            lam = self.lam[i] if self.copia[i] else 0.0
+            base = self.LP - lam                            # t vence u, u perde a partida i
+            S_a = V[sa][:, None] + V[sb][None, :] + base    # t vem da vaga A
+            S_b = V[sb][:, None] + V[sa][None, :] + base    # t vem da vaga B
+            u_a, u_b = arg(S_a, axis=1), arg(S_b, axis=1)
+            v_a, v_b = S_a[np.arange(n), u_a], S_b[np.arange(n), u_b]
+            de_b = (v_b > v_a) if self.mais else (v_b < v_a)
+            V[e + i] = np.where(de_b, v_b, v_a)
+            pode[e + i] = pode[e + m + i] = pode[sa] | pode[sb]
+            if self.copia[i]:
+                V[e + m + i] = np.where(pode[e + m + i], self.lam[i], self.neutro)
+            if rastro:
+                escolhas[i] = (de_b, u_a, u_b)
+        return V[e + m - 1], escolhas
+
+    def _alvo(self, final: np.ndarray, campeao: Optional[int]) -> int:
+        if campeao is not None:
+            return campeao
+        return int(np.argmax(final) if self.mais else np.argmin(final))
+
+    def __call__(self, vagas: list, j: int, campeao: Optional[int] = None) -> float:
+        """Limite para as partidas j..fim, dadas as vagas já decididas (fator de probabilidade)."""
+        final, _ = self._dp(vagas, j)
+        return float(np.exp(final[self._alvo(final, campeao)]))
+
+    def ajustar(self, vagas: list, iteracoes: int = ITERACOES_AJUSTE,
+                campeao: Optional[int] = None, passo: float = 0.5) -> float:
+        """Subgradiente em `lam` na raiz; guarda o `lam` do limite mais apertado."""
+        pl = self.plano
+        e, m = pl.n_entradas, pl.n_jogos
+        melhor, lam_melhor = -self.neutro, self.lam.copy()
+        for it in range(iteracoes + 1):
+            final, escolhas = self._dp(vagas, 0, rastro=True)
+            t = self._alvo(final, campeao)
+            if final[t] < melhor if self.mais else final[t] > melhor:
+                melhor, lam_melhor = final[t], self.lam.copy()
+            if it == iteracoes:
+                break
+            # solução relaxada: perdedor real e time escolhido para cada cópia
+            perdedor, copia, pilha = {}, {}, [(m - 1, t)]
+            while pilha:
+                i, t = pilha.pop()
+                de_b, u_a, u_b = escolhas[i]
+                sa, sb = pl.fontes[i]
+                u, sw, sl = (u_b[t], sb, sa) if de_b[t] else (u_a[t], sa, sb)
+                perdedor[i] = u
+                for s, time in ((sw, t), (sl, u)):
+                    if s >= e + m:
+                        copia[s - e - m] = time
+                    elif s >= e:
+                        pilha.append((s - e, time))
+            grad = np.zeros_like(self.lam)
+            for i, time in copia.items():
+                grad[i, time] += 1
+                grad[i, perdedor[i]] -= 1
+            if not grad.any():                              # relaxação exata
+                break
+            self.lam += (-1 if self.mais else 1) * passo / np.sqrt(it + 1) * grad
+        self.lam = lam_melhor
+        return float(np.exp(melhor))
+
+# ── 2. Busca best-first ───────────────────────────────────────
+def melhores_cenarios(P: np.ndarray, raizes: Sequence[Sequence[int]], k: int,
+                      plano: Plano = PLANO, campeao: Optional[int] = None,
+                      menos_provaveis: bool = False,
+                      max_nos: Optional[int] = MAX_NOS) -> Iterator[Cenario]:
+    """
+    Gera, do mais ao menos extremo, os k cenários completos mais prováveis
+    (ou menos, com `menos_provaveis`) entre todas as `raizes` (entradas da
+    chave, índices em P). Com `campeao`, só cenários em que esse time vence.
+    Cenários de probabilidade zero não contam. Levanta BuscaInterrompida
+    depois de `max_nos` nós (no campeonato de 8 times, poucos milhares bastam).
+    """
+    p_ab = np.asarray(P, dtype=float).tolist()
+    e, m = plano.n_entradas, plano.n_jogos
+    elimina = (plano.rodada_do_perdedor >= 0).tolist()
+    sinal = -1.0 if menos_provaveis else 1.0          # maximiza sinal × probabilidade
+    ordem = itertools.count()
+
+    # fila: (-chave, ordem, limite já calculado?, raiz, j, prob. do prefixo, máscara)
+    fila, limites = [], []
+    lam = None
+    for r, entradas in enumerate(raizes):
+        limite = Limite(np.asarray(P, dtype=float), plano, not menos_provaveis)
+        if campeao is None or campeao in entradas:
+            if lam is not None:
+                limite.lam = lam.copy()
+            teto = limite.ajustar(plano.vagas_iniciais(entradas),
+                                  ITERACOES_AJUSTE if lam is None else ITERACOES_RAIZES, campeao)
+            fila.append((-sinal * teto, next(ordem), True, r, 0, 1.0, 0))
+            lam = limite.lam
+        limites.append(limite)
+    heapq.heapify(fila)
+    completos: list = []      # chaves dos k melhores cenários completos já vistos
+    limpeza = 1 << 12         # tamanho da fila que dispara a remoção dos nós podados
+
+    def corte() -> float:
+        return completos[0] if len(completos) == k else -np.inf
+
+    saidos = nos = 0
+    while fila and saidos < k:
+        nos += 1
+        if max_nos is not None and nos > max_nos:
+            raise BuscaInterrompida(
+                f"busca interrompida após {max_nos:,} nós com {saidos} de {k} cenários; "
+                "ratings muito parelhos em chaves grandes deixam o limite frouxo. "
+                "Peça menos cenários ou aumente max_nos (None = sem limite).")
+        chave, _, calculado, r, j, p, mascara = heapq.heappop(fila)
+        if -chave < corte():
+            continue
+        vagas = plano.vagas_iniciais(raizes[r])
+        for i in range(j):
+            plano.jogar(vagas, i, mascara >> i & 1)
+        if j == m:
+            saidos += 1
+            yield Cenario(p, r, mascara, vagas[e + m - 1])
+            continue
+        if not calculado:                             # limite sob demanda (ver abaixo)
+            teto = sinal * p * limites[r](vagas, j, campeao)
+            if teto >= corte():
+                heapq.heappush(fila, (-teto, next(ordem), True, r, j, p, mascara))
+            continue
+
+        sa, sb = plano.fontes[j]
+        a, b = vagas[sa], vagas[sb]
+        for b_vence, perdedor, q in ((0, b, p_ab[a][b]), (1, a, 1 - p_ab[a][b])):
+            if q == 0 or (perdedor == campeao and elimina[j]):
+                continue
+            filho = (j + 1, p * q, mascara | b_vence << j)
+            if j + 1 == m:                            # cenário completo: chave exata
+                c = sinal * p * q
+                if c >= corte():
+                    heapq.heappush(fila, (-c, next(ordem), True, r, *filho))
+                    (heapq.heappush if len(completos) < k else heapq.heapreplace)(completos, c)
+            else:
+                # o filho herda o limite do pai (também vale para ele) e só
+                # calcula o seu ao chegar ao topo da fila
+                heapq.heappush(fila, (chave, next(ordem), False, r, *filho))
+        if len(fila) > limpeza:
+            fila = [x for x in fila if -x[0] >= corte()]
+            heapq.heapify(fila)
+            limpeza = max(limpeza, 2 * len(fila))
+
+# ── 3. Campeonato (mesmas colunas de caminhos.parquet) ────────
+def cenarios_campeonato(k: int, campeao: Optional[str] = None,
+                        menos_provaveis: bool = False, P: np.ndarray = None,
+                        max_nos: Optional[int] = MAX_NOS) -> pd.DataFrame:
+    """Top-k sobre as 24 permutações dos adversários: perm, mascara, probabilidade, campeao."""
+    P = carregar().P if P is None else P
+    raizes = [[INDICE[t] for t in FIXOS + list(p)] for p in PERMUT]
+    res: List[Cenario] = list(melhores_cenarios(
+        P, raizes, k, PLANO, None if campeao is None else INDICE[campeao], menos_provaveis,
+        max_nos))
+    return pd.DataFrame({
+        "perm": np.array([c.raiz for c in res], dtype=np.uint8),
+        "mascara": np.array([c.mascara for c in res], dtype=np.uint16),
+        "probabilidade": np.array([c.probabilidade for c in res], dtype=np.float64),
+        "campeao": pd.Categorical.from_codes([c.campeao for c in res], categories=TIMES),
+    })
+
+def main():
+    from codificacao_caminhos import linhas_caminho
+    P = carregar().P
+    df = cenarios_campeonato(k_cenarios, campeao, menos_provaveis, P)
+    for row in df.itertuples(index=False):
+        print(f"{row.campeao} — {row.probabilidade * 100:.4f}%")
+        print("  " + "\n  ".join(linhas_caminho(int(row.perm), int(row.mascara), P)))
+
+if __name__ == "__main__":
+    main()
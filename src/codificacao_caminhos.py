@@ -0,0 +1,169 @@
+"""
+Codificação compacta dos caminhos (double-elim, 8 equipes)
+Um cenário é definido pelo índice da permutação dos adversários (0–23)
+e por 14 bits de resultado: o bit k vale 1 quando o segundo time da
+k-ésima partida do plano (ver plano_chave) vence. Linhas de exibição
+("U1: G2 > PRX (63.12%)") e o dicionário da chave são reconstruídos sob demanda.
+"""
+
+from __future__ import annotations
+from typing import Dict, List, Tuple
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+from plano_chave import PLANO
+from probabilidades import FIXOS, TIMES, INDICE, PERMUT
+
+# ── 1. Chave: plano compilado (ver plano_chave) ───────────────
+# Entradas S1–S4 = FIXOS, T1–T4 = permutação dos VARIAVEIS; o bit k da
+# máscara é o resultado da k-ésima partida do plano.
+BIT = PLANO.bit
+
+# Tipos das colunas gravadas em caminhos.parquet. O campeão é gravado
+# como categoria (dicionário fixo = TIMES), lida pelo pandas como Categorical.
+SCHEMA = {"perm": np.uint8, "mascara": np.uint16,
+          "probabilidade": np.float64, "campeao": np.uint8}
+SCHEMA_ARROW = pa.schema([("perm", pa.uint8()), ("mascara", pa.uint16()),
+                          ("probabilidade", pa.float64()),
+                          ("campeao", pa.dictionary(pa.uint8(), pa.string()))])
+DICIONARIO_TIMES = pa.array(TIMES)
+LINHAS_POR_GRUPO = 65_536
+
+# ── 2. Decodificação ──────────────────────────────────────────
+def confrontos(perm: int, mascara: int) -> List[Tuple[str, str, str]]:
+    """Lista (partida, vencedor, perdedor) na ordem do plano."""
+    vagas = PLANO.vagas_iniciais(FIXOS + list(PERMUT[perm]))
+    res = []
+    for k, mid in enumerate(PLANO.ids):
+        PLANO.jogar(vagas, k, mascara >> k & 1)
+        res.append((mid, vagas[PLANO.vaga_vencedor(k)], vagas[PLANO.vaga_perdedor(k)]))
+    return res
+
+def info_bracket(perm: int, mascara: int,
+                 P: np.ndarray) -> Dict[str, Tuple[str, str, float]]:
+    """{partida: (vencedor, perdedor, prob. da vitória em %)}; P indexada por TIMES."""
+    return {mid: (w, l, 100 * P[INDICE[w], INDICE[l]])
+            for mid, w, l in confrontos(perm, mascara)}
+
+def linhas_caminho(perm: int, mascara: int, P: np.ndarray) -> List[str]:
+    """Linhas de exibição no formato 'U1: G2 > PRX (63.12%)'."""
+    return [f"{mid}: {w} > {l} ({p / 100:.2%})"
+            for mid, (w, l, p) in info_bracket(perm, mascara, P).items()]
+
+# ── 3. Gravação em streaming ──────────────────────────────────
+class EscritorCaminhos:
+    """
+    Grava caminhos direto em Parquet, um row group a cada
+    `linhas_por_grupo` linhas, com memória limitada ao buffer.
+    Linhas avulsas entram em listas; blocos já em Arrow (shards,
+    partições) ficam como tabelas pendentes, sem voltar para Python.
+    """
+
+    def __init__(self, destino, linhas_por_grupo: int = LINHAS_POR_GRUPO):
+        self._pq = pq.ParquetWriter(destino, SCHEMA_ARROW)
+        self._cap = linhas_por_grupo
+        self._buf: Dict[str, list] = {c: [] for c in SCHEMA}
+        self._pendentes: List[pa.Table] = []      # antes das listas, na ordem
+        self._n_pendentes = 0
+        self.total = 0
+
+    def _linhas(self) -> int:
+        return self._n_pendentes + len(self._buf["perm"])
+
+    def adicionar(self, perm: int, mascara: int, probabilidade: float, campeao: int):
+        for c, v in zip(SCHEMA, (perm, mascara, probabilidade, campeao)):
+            self._buf[c].append(v)
+        if self._linhas() >= self._cap:
+            self._descarregar(self._cap)
+
+    def adicionar_lote(self, perm: int, mascaras: list, probs: list, campeoes: list):
+        """Acrescenta várias linhas da mesma permutação de uma vez."""
+        self._buf["perm"].extend([perm] * len(mascaras))
+        self._buf["mascara"].extend(mascaras)
+        self._buf["probabilidade"].extend(probs)
+        self._buf["campeao"].extend(campeoes)
+        while self._linhas() >= self._cap:
+            self._descarregar(self._cap)
+
+    def adicionar_tabela(self, tabela: pa.Table):
+        """Acrescenta um bloco já gravado (ex.: shard de um worker), coluna a coluna em Arrow."""
+        self._mover_buffer()
+        indices = pc.index_in(tabela.column("campeao").cast(pa.string()), DICIONARIO_TIMES)
+        campeao = pa.chunked_array(
+            [pa.DictionaryArray.from_arrays(c.cast(pa.uint8()), DICIONARIO_TIMES)
+             for c in indices.chunks], SCHEMA_ARROW.field("campeao").type)
+        tabela = tabela.select(list(SCHEMA)).set_column(
+            len(SCHEMA) - 1, "campeao", campeao).cast(SCHEMA_ARROW)
+        self._pendentes.append(tabela)
+        self._n_pendentes += len(tabela)
+        while self._linhas() >= self._cap:
+            self._descarregar(self._cap)
+
+    def fechar_grupo(self):
+        """Grava o que está no buffer como um row group, mesmo incompleto."""
+        self._descarregar()
+
+    def _mover_buffer(self):
+        """Passa as listas para uma tabela pendente (mantém a ordem das linhas)."""
+        if self._buf["perm"]:
+            parte = dict(self._buf)
+            parte["campeao"] = pa.DictionaryArray.from_arrays(
+                pa.array(parte["campeao"], pa.uint8()), DICIONARIO_TIMES)
+            self._pendentes.append(pa.table(parte, schema=SCHEMA_ARROW))
+            self._n_pendentes += len(self._buf["perm"])
+            self._buf = {c: [] for c in SCHEMA}
+
+    def _descarregar(self, n: int | None = None):
+        self._mover_buffer()
+        n = self._n_pendentes if n is None else n
+        if n:
+            tabela = pa.concat_tables(self._pendentes)
+            self._pq.write_table(tabela.slice(0, n), row_group_size=n)
+            self.total += n
+            resto = tabela.slice(n)
+            self._pendentes = [resto] if len(resto) else []
+            self._n_pendentes = len(resto)
+
+    def fechar(self):
+        self._descarregar()
+        self._pq.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
+
+# ── 4. Leitura ────────────────────────────────────────────────
+def reorganizar_por_campeao(origem, destino):
+    """
+    Reescreve `origem` ordenado por campeão e probabilidade decrescente.
+    Cada campeão começa um row group novo, então as estatísticas do
+    Parquet permitem que filtros por campeão pulem os demais grupos.
+    Lê um campeão por vez, limitando a memória a essa partição.
+    """
+    with EscritorCaminhos(destino) as saida:
+        for t in TIMES:
+            parte = pq.read_table(origem, filters=[("campeao", "==", t)])
+            saida.adicionar_tabela(parte.sort_by([("probabilidade", "descending")]))
+            saida.fechar_grupo()
+    return saida.total
+
+def ler_caminhos(caminho, campeao: str | None = None,
+                 colunas: List[str] | None = None) -> pd.DataFrame:
+    """Lê só as `colunas` pedidas (None = todas); com `campeao`, só os row groups desse time."""
+    filtros = [("campeao", "==", campeao)] if campeao else None
+    colunas = list(SCHEMA) if colunas is None else colunas
+    return pd.read_parquet(caminho, columns=colunas, filters=filtros)
+
+def indice_por_campeao(df):
+    """Posições das linhas em ordem decrescente de probabilidade, por campeão e "Todos"."""
+    ordem = np.argsort(-df["probabilidade"].to_numpy(), kind="stable")
+    camp  = df["campeao"].cat.codes.to_numpy()[ordem]
+    indice = {"Todos": ordem}
+    for i, t in enumerate(df["campeao"].cat.categories):
+        if (pos := ordem[camp == i]).size:
+            indice[t] = pos
+    return indice
@@ -0,0 +1,152 @@
+"""
+Probabilidades exatas por fase (double-elim, 8 equipes)
+Propaga, partida a partida do plano compilado (ver plano_chave), a
+distribuição conjunta de quais times ocupam cada vaga da chave. Vagas que não serão mais usadas são
+descartadas e estados idênticos são somados, então o número de
+estados fica pequeno e o resultado sai sem erro amostral.
+Os estados não dependem de P, só os pesos: para uma pilha de matrizes
+(sensibilidade, incerteza) a estrutura é montada uma vez e os pesos de
+todas as matrizes andam juntos.
+"""
+
+from __future__ import annotations
+import itertools
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence
+import numpy as np
+from plano_chave import FASES, PLANO, Plano
+
+# ── 1. Colunas vivas/mortas por partida ───────────────────────
+# As colunas dos estados seguem o layout de vagas do plano:
+# entradas (S1–S4 cabeças, T1–T4 adversários), vencedores, perdedores.
+@lru_cache(maxsize=None)
+def _compilar(plano: Plano):
+    """Por partida: colunas que morrem (não são mais lidas) e colunas vivas."""
+    uso = np.full(plano.n_vagas, -1)            # última partida que lê a coluna
+    for k, (a, b) in enumerate(plano.fontes):
+        uso[a] = uso[b] = k
+    vivas, por_jogo = set(range(plano.n_entradas)), []
+    for k in range(plano.n_jogos):
+        cw, cl = plano.vaga_vencedor(k), plano.vaga_perdedor(k)
+        mortas = np.flatnonzero(uso == k).tolist()
+        vivas = (vivas | {cw, cl}) - set(mortas)
+        por_jogo.append((mortas, sorted(c for c in vivas if uso[c] > k)))
+    return por_jogo
+
+# ── 2. Propagação ─────────────────────────────────────────────
+def _agrupar(estados: np.ndarray, vivas: List[int], n_times: int):
+    """Estados distintos nas vagas vivas e, para cada linha, o seu grupo."""
+    if n_times ** len(vivas) < 2 ** 62:            # cabe numa chave int64
+        chave = estados[:, vivas] @ (n_times ** np.arange(len(vivas), dtype=np.int64))
+        _, pos, inv = np.unique(chave, return_index=True, return_inverse=True)
+        return estados[pos], inv.ravel()
+    unicos, inv = np.unique(estados, axis=0, return_inverse=True)
+    return unicos, inv.ravel()
+
+def _fundir(estados: np.ndarray, pesos: np.ndarray, vivas: List[int], n_times: int):
+    """Soma os pesos de estados que ocupam as vagas vivas com os mesmos times."""
+    unicos, inv = _agrupar(estados, vivas, n_times)
+    return unicos, np.bincount(inv, weights=pesos)
+
+def propagar(P: np.ndarray, estados: np.ndarray, pesos: np.ndarray,
+             decididos: Optional[Dict[str, int]] = None,
+             plano: Plano = PLANO) -> np.ndarray:
+    """
+    Executa todas as partidas do plano a partir de uma mistura de estados
+    iniciais (linhas com o time de cada vaga de entrada, com pesos somando 1).
+    `decididos` fixa o vencedor (índice do time) de partidas já escolhidas;
+    o resultado passa a ser condicional a essas escolhas.
+    Retorna a matriz times × FASES com a probabilidade acumulada de cada fase.
+    """
+    decididos = {plano.bit[mid]: t for mid, t in (decididos or {}).items()}
+    fases = np.zeros((len(P), len(FASES)))
+    for k, ((a, b), (mortas, vivas)) in enumerate(zip(plano.fontes, _compilar(plano))):
+        cw, cl = plano.vaga_vencedor(k), plano.vaga_perdedor(k)
+        ta, tb = estados[:, a], estados[:, b]
+        pa = P[ta, tb] if k not in decididos else (ta == decididos[k]).astype(float)
+        filhos = np.concatenate([estados, estados])
+        filhos[:, cw] = np.concatenate([ta, tb])
+        filhos[:, cl] = np.concatenate([tb, ta])
+        pesos = np.concatenate([pesos * pa, pesos * (1 - pa)])
+        if k in decididos:                         # ramos impossíveis saem
+            filhos, pesos = filhos[pesos > 0], pesos[pesos > 0]
+        if (f := plano.fase_do_vencedor[k]) >= 0:
+            fases[:, f] += np.bincount(filhos[:, cw], weights=pesos, minlength=len(P))
+        estados, pesos = _fundir(filhos, pesos, vivas, len(P))
+    return fases
+
+# ── 3. Pilha de matrizes (mesma estrutura, pesos em lote) ─────
+LOTE_MATRIZES = 32            # matrizes por bloco (pesos cabem no cache)
+
+def _passos(estados: np.ndarray, n_times: int, plano: Plano):
+    """
+    Por partida: times em A e B de cada estado, fase do vencedor, matriz
+    (estado filho × time) do vencedor e como os filhos se fundem
+    (ordem + inícios para np.add.reduceat).
+    """
+    passos = []
+    for k, ((a, b), (mortas, vivas)) in enumerate(zip(plano.fontes, _compilar(plano))):
+        cw, cl = plano.vaga_vencedor(k), plano.vaga_perdedor(k)
+        ta, tb = estados[:, a], estados[:, b]
+        filhos = np.concatenate([estados, estados])
+        filhos[:, cw] = np.concatenate([ta, tb])
+        filhos[:, cl] = np.concatenate([tb, ta])
+        f = plano.fase_do_vencedor[k]
+        vencedor = np.eye(n_times)[filhos[:, cw]] if f >= 0 else None
+        estados, inv = _agrupar(filhos, vivas, n_times)
+        ordem = np.argsort(inv, kind="stable")
+        inicios = np.flatnonzero(np.r_[True, np.diff(inv[ordem]) != 0])
+        passos.append((ta, tb, f, vencedor, ordem, inicios))
+    return passos
+
+def propagar_lote(Ps: np.ndarray, estados: np.ndarray, pesos: np.ndarray,
+                  plano: Plano = PLANO, lote: int = LOTE_MATRIZES) -> np.ndarray:
+    """propagar para cada matriz da pilha Ps (B × N × N): B × times × FASES."""
+    B, N = Ps.shape[0], Ps.shape[1]
+    passos = _passos(estados, N, plano)
+    fases = np.zeros((B, N, len(FASES)))
+    for i in range(0, B, lote):
+        P = Ps[i:i + lote]
+        W = np.broadcast_to(pesos, (len(P), len(pesos)))
+        for ta, tb, f, vencedor, ordem, inicios in passos:
+            pa = P[:, ta, tb]
+            W = np.concatenate([W * pa, W * (1 - pa)], axis=1)
+            if f >= 0:
+                fases[i:i + lote, :, f] += W @ vencedor
+            W = np.add.reduceat(W[:, ordem], inicios, axis=1)
+    return fases
+
+# ── 4. Pontos de entrada ──────────────────────────────────────
+def estados_iniciais(cabecas: Sequence[int], variaveis: Sequence[int],
+                     plano: Plano = PLANO):
+    """Uma linha por permutação dos adversários, todas com o mesmo peso."""
+    perms = list(itertools.permutations(variaveis))
+    estados = np.zeros((len(perms), plano.n_vagas), dtype=np.intp)
+    estados[:, :len(cabecas)] = cabecas
+    estados[:, len(cabecas):plano.n_entradas] = perms
+    return estados, np.full(len(perms), 1 / len(perms))
+
+def probabilidades_fases(P: np.ndarray, cabecas: Sequence[int],
+                         variaveis: Sequence[int], plano: Plano = PLANO) -> np.ndarray:
+    """
+    Probabilidade exata (0–1) de cada time chegar à Semifinal, à Final e ser
+    Vencedor, com os adversários dos cabeças sorteados entre as permutações.
+    """
+    return propagar(P, *estados_iniciais(cabecas, variaveis, plano), plano=plano)
+
+def probabilidades_condicionais(P: np.ndarray, cabecas: Sequence[int],
+                                adversarios: Sequence[int],
+                                vencedores: Dict[str, int],
+                                plano: Plano = PLANO) -> np.ndarray:
+    """
+    Como probabilidades_fases, mas com os confrontos iniciais definidos e
+    os vencedores de algumas partidas ({mid: índice do time}) já fixados.
+    """
+    estados = np.zeros((1, plano.n_vagas), dtype=np.intp)
+    estados[0, :plano.n_entradas] = list(cabecas) + list(adversarios)
+    return propagar(P, estados, np.ones(1), vencedores, plano)
+
+def probabilidades_fases_lote(Ps: np.ndarray, cabecas: Sequence[int],
+                              variaveis: Sequence[int], plano: Plano = PLANO) -> np.ndarray:
+    """probabilidades_fases para cada matriz da pilha Ps (B × N × N): B × times × FASES."""
+    return propagar_lote(Ps, *estados_iniciais(cabecas, variaveis, plano), plano=plano)
@@ -0,0 +1,147 @@
+"""
+Histórico de Elo indexado por time e data
+Guarda, para cada time, o rating depois de cada partida em um parquet
+colunar ordenado por (time, data). No modo incremental as partidas novas
+vão para arquivos de parte ao lado (historico_elo.parte0001.parquet, ...),
+unidos na leitura; com muitas partes o histórico é compactado de novo
+num arquivo só. Ao ler, um índice de início por time permite responder
+"ratings de todos os times na data D" com uma busca binária por time,
+sem refazer a recorrência de calculo_elo_completo.
+Gera: data/historico_elo.parquet e partes (escritos por calculo_elo_completo.py)
+"""
+
+from __future__ import annotations
+import glob, os
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+HISTORICO = "data/historico_elo.parquet"
+MAX_PARTES = 20               # com tantas partes, o próximo acréscimo compacta tudo
+
+# ── 1. Gravação (uma linha por time por partida) ──────────────
+def linhas_historico(elo_history: pd.DataFrame, inicio: int = 0) -> pd.DataFrame:
+    """Histórico de atualizar_elo (uma linha por partida) → time, data, ordem, elo."""
+    n = len(elo_history)
+    ordem = np.arange(inicio, inicio + n, dtype=np.int32)   # ordem de aplicação
+    return pd.DataFrame({
+        "time": np.concatenate([elo_history["team_a"], elo_history["team_b"]]),
+        "data": np.concatenate([elo_history["data"], elo_history["data"]]),
+        "ordem": np.concatenate([ordem, ordem]),
+        "elo": np.concatenate([elo_history["elo_a_after"], elo_history["elo_b_after"]]),
+    })
+
+def partes(caminho: str = HISTORICO) -> List[str]:
+    """Arquivos de parte do histórico, na ordem em que foram gravados."""
+    return sorted(glob.glob(caminho[:-len(".parquet")] + ".parte*.parquet"))
+
+def _proxima_ordem(arquivos: List[str]) -> int:
+    """1 + maior `ordem` gravada, pelas estatísticas do parquet (sem ler as linhas)."""
+    maior = -1
+    for arq in arquivos:
+        meta = pq.ParquetFile(arq).metadata
+        col = meta.schema.names.index("ordem")
+        for g in range(meta.num_row_groups):
+            est = meta.row_group(g).column(col).statistics
+            if est is not None and est.has_min_max:
+                maior = max(maior, est.max)
+    return maior + 1
+
+def _ordenado(df: pd.DataFrame) -> pd.DataFrame:
+    df["time"] = df["time"].astype(str)
+    df["data"] = pd.to_datetime(df["data"]).astype("datetime64[ns]")
+    df = df.sort_values(["time", "data", "ordem"], kind="stable", ignore_index=True)
+    df["time"] = df["time"].astype("category")
+    return df
+
+def gravar_historico(elo_history: pd.DataFrame, anexar: bool = False,
+                     caminho: str = HISTORICO) -> pd.DataFrame:
+    """
+    Grava o histórico ordenado por time, data e ordem. Com `anexar`, só as
+    linhas novas são gravadas, numa parte nova; a cada MAX_PARTES partes
+    tudo é compactado de volta em `caminho`. Retorna as linhas gravadas.
+    """
+    anteriores = partes(caminho)
+    existentes = (([caminho] if os.path.exists(caminho) else []) + anteriores) if anexar else []
+    novas = linhas_historico(elo_history, _proxima_ordem(existentes))
+    if not existentes:
+        destino = caminho
+    elif len(anteriores) < MAX_PARTES:
+        destino = f"{caminho[:-len('.parquet')]}.parte{len(anteriores) + 1:04d}.parquet"
+    else:                                       # compacta: base + partes + novas
+        novas = pd.concat([_ler(existentes), novas], ignore_index=True)
+        destino = caminho
+    novas = _ordenado(novas)
+    novas.to_parquet(destino, index=False)
+    if destino == caminho:
+        for arq in anteriores:
+            os.remove(arq)
+    _ler_historico.cache_clear()
+    return novas
+
+# ── 2. Consulta por data (busca binária por time) ─────────────
+@dataclass(frozen=True)
+class HistoricoElo:
+    nomes: List[str]              # time por código
+    inicio: np.ndarray            # linhas de nomes[i]: inicio[i]:inicio[i + 1]
+    datas: np.ndarray             # datetime64[ns], crescente dentro de cada time
+    elos: np.ndarray              # rating depois da partida
+
+    @property
+    def primeira_data(self) -> pd.Timestamp:
+        return pd.Timestamp(self.datas.min())
+
+    @property
+    def ultima_data(self) -> pd.Timestamp:
+        return pd.Timestamp(self.datas.max())
+
+    def em(self, data, times: Optional[Iterable[str]] = None,
+           padrao: float = 1500.0) -> Dict[str, float]:
+        """Rating de cada time ao fim do dia `data`; `padrao` para quem ainda não jogou."""
+        d = np.datetime64(pd.Timestamp(data).normalize() + pd.Timedelta(days=1), "ns")
+        codigo = {t: i for i, t in enumerate(self.nomes)}
+        elos = {}
+        for t in (self.nomes if times is None else times):
+            i = codigo.get(t)
+            if i is None:
+                elos[t] = padrao
+                continue
+            a, b = self.inicio[i], self.inicio[i + 1]
+            j = a + np.searchsorted(self.datas[a:b], d, side="left") - 1
+            elos[t] = float(self.elos[j]) if j >= a else padrao
+        return elos
+
+    def serie(self, time: str) -> pd.Series:
+        """Evolução do rating de um time (índice = data da partida)."""
+        i = self.nomes.index(time)
+        a, b = self.inicio[i], self.inicio[i + 1]
+        return pd.Series(self.elos[a:b], index=pd.DatetimeIndex(self.datas[a:b]), name=time)
+
+def _ler(arquivos: List[str]) -> pd.DataFrame:
+    df = pd.concat([pd.read_parquet(a) for a in arquivos], ignore_index=True)
+    df["time"] = df["time"].astype(str)
+    return df
+
+def versao_historico(caminho: str = HISTORICO) -> tuple:
+    """(arquivo, mtime) do parquet e das partes: muda quando o histórico é regravado."""
+    return tuple((a, os.stat(a).st_mtime_ns) for a in [caminho] + partes(caminho))
+
+def ler_historico(caminho: str = HISTORICO) -> HistoricoElo:
+    """Lê o parquet (e as partes) uma vez por versão e monta o índice de início por time."""
+    return _ler_historico(caminho, versao_historico(caminho))
+
+@lru_cache(maxsize=4)
+def _ler_historico(caminho: str, versao: tuple) -> HistoricoElo:
+    extras = [a for a, _ in versao[1:]]
+    df = _ordenado(_ler([caminho] + extras)) if extras else pd.read_parquet(caminho)
+    codigos = df["time"].cat.codes.to_numpy()
+    nomes = list(df["time"].cat.categories)
+    return HistoricoElo(
+        nomes=nomes,
+        inicio=np.searchsorted(codigos, np.arange(len(nomes) + 1)),
+        datas=df["data"].to_numpy(dtype="datetime64[ns]"),
+        elos=df["elo"].to_numpy(dtype=float),
+    )
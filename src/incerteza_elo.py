@@ -0,0 +1,104 @@
+"""
+Incerteza dos ratings propagada até as chances por fase
+Os Elos de elo_final_campeonato.csv saem de pouco mais de cem partidas.
+Aqui o histórico é reamostrado com reposição (bootstrap, mantendo a ordem
+cronológica) e a recorrência de Elo roda para todas as réplicas juntas
+(matriz réplicas × times). Cada vetor de ratings resultante vira uma
+matriz de probabilidades e a pilha inteira passa de uma vez pelo cálculo
+exato em lote (ver fases_exatas), dando a distribuição da chance de cada
+time chegar a cada fase e seus intervalos.
+Gera: nada (tabela impressa; usado pela aba de estatísticas do app)
+"""
+
+from __future__ import annotations
+from typing import NamedTuple, Optional
+import numpy as np
+import pandas as pd
+from calculo_elo_completo import (ELO_INICIAL, Partidas, atualizar_elo, k_dinamico,
+                                  ler_partidas, preparar_partidas)
+from fases_exatas import FASES, probabilidades_fases_lote
+from probabilidades import FIXOS, INDICE, TIMES, VARIAVEIS, prob_vitoria
+
+# ── 0. Configuração ───────────────────────────────────────────
+n_amostras = 1000            # réplicas do histórico
+nivel      = 0.95            # intervalo central
+semente    = 0
+
+class Incerteza(NamedTuple):
+    ratings: np.ndarray       # réplicas × TIMES
+    fases: np.ndarray         # réplicas × TIMES × FASES (0–1)
+    pontual: np.ndarray       # TIMES × FASES com o histórico original
+
+# ── 1. Bootstrap do histórico (réplicas em paralelo) ──────────
+def ratings_bootstrap(partidas: Partidas, n: int, rng) -> np.ndarray:
+    """
+    n réplicas × times: cada réplica sorteia len(partidas) partidas com
+    reposição, aplica-as na ordem original e guarda os ratings finais.
+    """
+    m = len(partidas)
+    J = np.sort(rng.integers(m, size=(n, m)), axis=1)     # ordem cronológica
+    K = k_dinamico(partidas.delta, partidas.prorroga)[J]
+    A, B, S = partidas.ia[J], partidas.ib[J], partidas.score_a[J]
+    R = np.full((n, len(partidas.nomes)), ELO_INICIAL)
+    linhas = np.arange(n)
+    for j in range(m):                                    # um passo para todas as réplicas
+        a, b = A[:, j], B[:, j]
+        esperado = 1 / (1 + 10 ** ((R[linhas, b] - R[linhas, a]) / 400))
+        d = K[:, j] * (S[:, j] - esperado)
+        R[linhas, a] += d
+        R[linhas, b] -= d
+    return R
+
+def _colunas(partidas: Partidas, R: np.ndarray) -> np.ndarray:
+    """Colunas de R na ordem de TIMES (ELO_INICIAL para quem não jogou)."""
+    codigo = {t: i for i, t in enumerate(partidas.nomes)}
+    return np.stack([R[:, codigo[t]] if t in codigo else np.full(len(R), ELO_INICIAL)
+                     for t in TIMES], axis=1)
+
+# ── 2. Ratings → fases (pilha de matrizes) ────────────────────
+def fases_lote(R: np.ndarray) -> np.ndarray:
+    """réplicas × TIMES → réplicas × TIMES × FASES pelo cálculo exato em lote."""
+    Ps = prob_vitoria(R[:, :, None], R[:, None, :])
+    return probabilidades_fases_lote(Ps, [INDICE[t] for t in FIXOS],
+                                     [INDICE[t] for t in VARIAVEIS])
+
+def incerteza(n: int = n_amostras, rng=semente, ate=None) -> Incerteza:
+    """Réplicas do histórico (até a data `ate`, se dada) levadas até as fases."""
+    df, _, _ = ler_partidas()
+    if ate is not None:
+        df = df[df["data"] < pd.Timestamp(ate).normalize() + pd.Timedelta(days=1)]
+    partidas = preparar_partidas(df)
+    R = _colunas(partidas, ratings_bootstrap(partidas, n, np.random.default_rng(rng)))
+
+    # histórico original, para comparar com a distribuição
+    r = np.full(len(partidas.nomes), ELO_INICIAL)
+    atualizar_elo(partidas, r, k_dinamico(partidas.delta, partidas.prorroga))
+    pontual = fases_lote(_colunas(partidas, r[None, :]))[0]
+    return Incerteza(R, fases_lote(R), pontual)
+
+# ── 3. Resumo ─────────────────────────────────────────────────
+def resumo(inc: Incerteza, nivel: float = nivel, fase: Optional[str] = None) -> pd.DataFrame:
+    """Por time (e fase): valor pontual, mediana e intervalo central `nivel`, em %."""
+    q = np.quantile(inc.fases, [(1 - nivel) / 2, 0.5, (1 + nivel) / 2], axis=0) * 100
+    partes = []
+    for f, nome in enumerate(FASES):
+        if fase is not None and nome != fase:
+            continue
+        partes.append(pd.DataFrame({
+            "time": TIMES, "fase": nome, "pontual": inc.pontual[:, f] * 100,
+            "mediana": q[1, :, f], "inferior": q[0, :, f], "superior": q[2, :, f],
+        }).sort_values("pontual", ascending=False))
+    return pd.concat(partes, ignore_index=True)
+
+def main():
+    import time
+    t = time.perf_counter()
+    inc = incerteza(n_amostras, semente)
+    print(f"{n_amostras} réplicas do histórico em {time.perf_counter() - t:.2f} s")
+    df = resumo(inc, nivel)
+    for nome in FASES:
+        print(f"\n{nome} (% — pontual, mediana e intervalo de {nivel:.0%}):")
+        print(df[df.fase == nome].drop(columns="fase").round(2).to_string(index=False))
+
+if __name__ == "__main__":
+    main()
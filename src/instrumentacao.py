@@ -0,0 +1,87 @@
+"""
+Instrumentação leve (tempos e contadores por execução)
+Trechos nomeados (`with inst.span("load_data"):`) e contadores; cada
+rerun do app cria uma instância, que vira um relatório (tempo de cada
+trecho, memória residente ao fim dele, contadores) mostrado no painel
+de debug e acrescentado a um log JSONL (girado ao passar de MAX_LOG
+bytes, guardando só o arquivo anterior). Desligada, `span` devolve um
+contexto nulo compartilhado e `contar` retorna na hora.
+"""
+
+from __future__ import annotations
+import contextlib, json, os, time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+LOG     = "logs/tempos_app.jsonl"
+MAX_LOG = 5 * 2**20           # bytes; acima disso o log vira LOG + ".1" (o antigo .1 sai)
+
+_NULO = contextlib.nullcontext()
+
+# ── 1. Memória ────────────────────────────────────────────────
+def memoria_mb() -> Optional[float]:
+    """Memória residente atual do processo (Linux), senão o pico; None se indisponível."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource, sys
+        pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return pico / 2**20 if sys.platform == "darwin" else pico / 2**10
+    except ImportError:
+        return None
+
+# ── 2. Trechos e contadores ───────────────────────────────────
+class Instrumentacao:
+    def __init__(self, ativo: bool = False, rotulo: str = ""):
+        self.ativo = ativo
+        self.rotulo = rotulo
+        self.spans: List[Dict[str, object]] = []
+        self.contadores: Dict[str, int] = {}
+        self._pilha: List[str] = []
+        self._inicio = time.perf_counter()
+
+    def span(self, nome: str):
+        """Mede o bloco `with`; trechos aninhados ganham nome "pai/filho"."""
+        return self._span(nome) if self.ativo else _NULO
+
+    @contextlib.contextmanager
+    def _span(self, nome: str):
+        self._pilha.append(nome)
+        caminho = "/".join(self._pilha)
+        t = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._pilha.pop()
+            self.spans.append({"nome": caminho,
+                               "ms": (time.perf_counter() - t) * 1e3,
+                               "memoria_mb": memoria_mb()})
+
+    def contar(self, nome: str, n: int = 1):
+        if self.ativo:
+            self.contadores[nome] = self.contadores.get(nome, 0) + n
+
+    # ── 3. Relatório ──────────────────────────────────────────
+    def relatorio(self) -> Dict[str, object]:
+        return {"data": datetime.now().isoformat(timespec="seconds"),
+                "rotulo": self.rotulo,
+                "total_ms": (time.perf_counter() - self._inicio) * 1e3,
+                "memoria_mb": memoria_mb(),
+                "spans": self.spans,
+                "contadores": self.contadores}
+
+    def despejar(self, caminho: str = LOG) -> Dict[str, object]:
+        """Acrescenta o relatório desta execução ao log (uma linha JSON)."""
+        rel = self.relatorio()
+        os.makedirs(os.path.dirname(caminho) or ".", exist_ok=True)
+        try:
+            if os.path.getsize(caminho) >= MAX_LOG:
+                os.replace(caminho, caminho + ".1")
+        except OSError:                              # ainda não existe
+            pass
+        with open(caminho, "a", encoding="utf-8") as f:
+            f.write(json.dumps(rel, ensure_ascii=False) + "\n")
+        return rel
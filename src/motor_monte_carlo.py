@@ -0,0 +1,172 @@
+"""
+Motor Monte Carlo vetorizado (double-elim, 8 equipes)
+Simula N chaves por permutação de uma só vez com NumPy:
+times viram índices inteiros, as probabilidades de vitória
+ficam numa matriz pré-calculada (ver probabilidades) e os
+sorteios são feitos por lote. A chave é o plano compilado
+(ver plano_chave), então outros formatos usam o mesmo laço.
+No modo paralelo o trabalho é dividido em unidades (permutação × lote),
+cada uma com seu próprio gerador derivado da semente, e as contagens
+são somadas na ordem das unidades: a mesma semente dá o mesmo resultado
+com qualquer número de processos. No modo adaptativo a simulação segue
+em lotes até o intervalo de confiança de cada time × fase caber na
+tolerância pedida.
+"""
+
+from __future__ import annotations
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+from statistics import NormalDist
+from typing import Iterator, NamedTuple, Sequence, Tuple
+import numpy as np
+from plano_chave import FASES, PLANO, Plano
+
+LOTE_MAX     = 1 << 20      # chaves simuladas por bloco (limita a memória)
+LOTE_UNIDADE = 100_000      # simulações por unidade de trabalho no modo paralelo
+LOTE_AMOSTRAS = 500         # amostras por lote no modo adaptativo
+MIN_AMOSTRAS  = 1_000       # antes disso a variância estimada não é confiável
+
+# ── 1. Um bloco de chaves completas (ordem das partidas do plano) ──
+def _simular_bloco(P, plano: Plano, entradas, n, rng, fases):
+    # um sorteio por partida, na ordem do plano: A vence se r < P[a, b]
+    V = plano.executar_lote(np.broadcast_to(entradas, (n, plano.n_entradas)),
+                            lambda k, a, b: rng.random(n) >= P[a, b])
+    for f in range(len(FASES)):
+        vencedores = V[plano.n_entradas + plano.jogos_da_fase(f)]
+        fases[:, f] += np.bincount(vencedores.ravel(), minlength=len(P))
+
+def simular_entradas(P: np.ndarray, entradas: Sequence[int], n: int,
+                     rng=None, plano: Plano = PLANO) -> np.ndarray:
+    """
+    Simula n chaves de `plano` com os times `entradas` (índices em P, na
+    ordem de plano.formato.entradas). Retorna contagens acumuladas por time
+    (linhas) e fase (colunas de FASES): chegar à Semifinal, à Final e ser Vencedor.
+    """
+    rng = np.random.default_rng(rng)
+    entradas = np.asarray(entradas, dtype=np.intp)
+    fases = np.zeros((len(P), len(FASES)), dtype=np.int64)
+    feitos = 0
+    while feitos < n:
+        m = min(LOTE_MAX, n - feitos)
+        _simular_bloco(P, plano, entradas, m, rng, fases)
+        feitos += m
+    return fases
+
+def simular_lote(P: np.ndarray, cabecas: Sequence[int], adversarios: Sequence[int],
+                 n: int, rng=None, plano: Plano = PLANO) -> np.ndarray:
+    """simular_entradas com os confrontos iniciais cabecas[i] × adversarios[i]."""
+    return simular_entradas(P, list(cabecas) + list(adversarios), n, rng, plano)
+
+def simular_permutacoes(P: np.ndarray, cabecas: Sequence[int],
+                        variaveis: Sequence[int], n_por_perm: int,
+                        rng=None, plano: Plano = PLANO) -> np.ndarray:
+    """Soma de simular_lote sobre todas as permutações dos adversários."""
+    rng = np.random.default_rng(rng)
+    fases = np.zeros((len(P), len(FASES)), dtype=np.int64)
+    for perm in itertools.permutations(variaveis):
+        fases += simular_lote(P, cabecas, perm, n_por_perm, rng, plano)
+    return fases
+
+# ── 2. Modo paralelo (unidades permutação × lote) ─────────────
+def gerador_da_unidade(semente: int, chave: Tuple[int, int]) -> np.random.Generator:
+    """Fluxo independente da unidade `chave` = (permutação, lote); só depende da semente e da chave."""
+    return np.random.default_rng(np.random.SeedSequence(semente, spawn_key=chave))
+
+def unidades(cabecas: Sequence[int], variaveis: Sequence[int], n_por_perm: int,
+             tamanho_lote: int = LOTE_UNIDADE) -> Iterator[Tuple[Tuple[int, int], list, int]]:
+    """(chave, entradas, simulações) de cada unidade, na ordem de soma."""
+    for i, perm in enumerate(itertools.permutations(variaveis)):
+        for b, inicio in enumerate(range(0, n_por_perm, tamanho_lote)):
+            yield (i, b), list(cabecas) + list(perm), min(tamanho_lote, n_por_perm - inicio)
+
+_P, _PLANO = None, PLANO                    # estado de cada processo do pool
+
+def _iniciar(P, plano):
+    global _P, _PLANO
+    _P, _PLANO = P, plano
+
+def _simular_unidade(tarefa) -> np.ndarray:
+    semente, chave, entradas, n = tarefa
+    return simular_entradas(_P, entradas, n, gerador_da_unidade(semente, chave), _PLANO)
+
+def simular_paralelo(P: np.ndarray, cabecas: Sequence[int], variaveis: Sequence[int],
+                     n_por_perm: int, semente: int, processos: int = 1,
+                     tamanho_lote: int = LOTE_UNIDADE, plano: Plano = PLANO) -> np.ndarray:
+    """
+    Como simular_permutacoes, com as unidades espalhadas por `processos`
+    processos. Para uma mesma semente e `tamanho_lote`, o resultado é
+    idêntico com qualquer número de processos.
+    """
+    tarefas = [(semente, chave, entradas, n)
+               for chave, entradas, n in unidades(cabecas, variaveis, n_por_perm, tamanho_lote)]
+    fases = np.zeros((len(P), len(FASES)), dtype=np.int64)
+    if processos <= 1:
+        for semente_, chave, entradas, n in tarefas:
+            fases += simular_entradas(P, entradas, n, gerador_da_unidade(semente_, chave), plano)
+        return fases
+    with ProcessPoolExecutor(processos, initializer=_iniciar, initargs=(P, plano)) as pool:
+        lote = max(1, len(tarefas) // (4 * processos))
+        for parcial in pool.map(_simular_unidade, tarefas, chunksize=lote):   # mantém a ordem
+            fases += parcial
+    return fases
+
+# ── 3. Modo adaptativo (intervalos de confiança + parada) ─────
+class Estimativa(NamedTuple):
+    probabilidades: np.ndarray    # times × FASES
+    meia_largura: np.ndarray      # intervalo = probabilidades ± meia_largura
+    amostras: int                 # cada uma: todas as permutações, em par antitético
+    simulacoes: int               # chaves simuladas de fato
+    convergiu: bool               # False quando parou em max_amostras
+
+def _amostras_lote(P, plano: Plano, E: np.ndarray, n: int, rng) -> np.ndarray:
+    """
+    n amostras (n × times × FASES). Cada amostra simula todas as linhas de
+    E com sorteios u e de novo com 1 - u (antitéticas). Em vez de contar
+    o vencedor de cada partida que leva a uma fase, soma a chance de cada
+    um vencê-la dados os dois times (esperança condicional): mesma média,
+    variância menor.
+    """
+    R, N, F = len(E), len(P), len(FASES)
+    U = rng.random((n * R, plano.n_jogos))
+    U = np.concatenate([U, 1 - U])
+    amostra = np.tile(np.repeat(np.arange(n), R), 2)
+    Y = np.zeros(n * N * F)
+
+    def b_vence(k, a, b):
+        f = plano.fase_do_vencedor[k]
+        if f >= 0:
+            p = P[a, b]
+            Y[:] += np.bincount((amostra * N + a) * F + f, p, len(Y))
+            Y[:] += np.bincount((amostra * N + b) * F + f, 1 - p, len(Y))
+        return U[:, k] >= P[a, b]
+
+    plano.executar_lote(np.tile(E, (2 * n, 1)), b_vence)
+    return Y.reshape(n, N, F) / (2 * R)
+
+def simular_adaptativo(P: np.ndarray, cabecas: Sequence[int], variaveis: Sequence[int],
+                       tolerancia: float = 0.005, confianca: float = 0.95,
+                       rng=None, max_amostras: int = 1_000_000,
+                       lote: int = LOTE_AMOSTRAS, plano: Plano = PLANO) -> Estimativa:
+    """
+    Probabilidade de cada time atingir cada fase (média sobre as permutações
+    dos adversários), simulando em lotes até a meia-largura de todos os
+    intervalos de `confianca` ficar abaixo de `tolerancia` (escala 0–1).
+    """
+    rng = np.random.default_rng(rng)
+    E = np.array([list(cabecas) + list(p) for p in itertools.permutations(variaveis)],
+                 dtype=np.intp)
+    z = NormalDist().inv_cdf((1 + confianca) / 2)
+    soma = np.zeros((len(P), len(FASES)))
+    soma2 = np.zeros_like(soma)
+    n = 0
+    while n < max_amostras:
+        Y = _amostras_lote(P, plano, E, min(lote, max_amostras - n), rng)
+        soma += Y.sum(axis=0)
+        soma2 += (Y * Y).sum(axis=0)
+        n += len(Y)
+        media = soma / n
+        var = np.maximum(soma2 / n - media ** 2, 0) * n / max(n - 1, 1)
+        meia = z * np.sqrt(var / n)
+        if n >= MIN_AMOSTRAS and meia.max() <= tolerancia:
+            break
+    return Estimativa(media, meia, n, 2 * n * len(E), bool(meia.max() <= tolerancia))
@@ -0,0 +1,197 @@
+"""
+Plano compilado da chave (formato declarativo → arrays de inteiros)
+Um formato lista as entradas e as partidas, com fontes em texto
+("S1", "W(U1)", "L(U3)"); `compilar` resolve essas fontes uma única vez
+em índices de vaga. Layout das vagas:
+    [entradas | vencedor de cada partida | perdedor de cada partida]
+Enumerador, motor Monte Carlo, cálculo exato, decodificação dos caminhos
+e simulador manual executam o mesmo plano, na ordem das partidas.
+"""
+
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Sequence, Tuple
+import numpy as np
+
+FASES = ["Semifinal", "Final", "Vencedor"]
+
+# ── 1. Formato declarativo ────────────────────────────────────
+@dataclass(frozen=True)
+class Formato:
+    nome: str
+    entradas: List[str]                   # S1..Sn/2 (cabeças), T1..Tn/2
+    partidas: List[Tuple[str, str, str]]  # (id, fonte A, fonte B), em ordem jogável
+    fases: Dict[str, List[str]]           # fase (FASES) → partidas cujo vencedor a atinge
+    eliminacao: Dict[str, List[str]]      # rodada → partidas cujo perdedor cai nela
+
+def _rodadas_upper(n: int) -> List[List[str]]:
+    rodadas, k, m = [], 1, n // 2
+    while m >= 1:
+        rodadas.append([f"U{k + i}" for i in range(m)])
+        k, m = k + m, m // 2
+    return rodadas
+
+def dupla_eliminacao(n: int) -> Formato:
+    """
+    Dupla eliminação para n = 2^r times, sem reset na grande final.
+    A lower alterna rodadas de "queda" (vencedores da lower × perdedores
+    da rodada j da upper) e de redução; a ordem das partidas para n = 8
+    é a AGENDA original (U1–U4, U5, U6, L1–L5, U7, L6, GF).
+    """
+    if n < 4 or n & (n - 1):
+        raise ValueError("dupla eliminação precisa de 2^r times (r >= 2)")
+    S = [f"S{i + 1}" for i in range(n // 2)]
+    T = [f"T{i + 1}" for i in range(n // 2)]
+    upper = _rodadas_upper(n)
+    fonte_upper = [[(S[i], T[i]) for i in range(n // 2)]]
+    for ant, rod in zip(upper, upper[1:]):
+        fonte_upper.append([(f"W({ant[2 * i]})", f"W({ant[2 * i + 1]})")
+                            for i in range(len(rod))])
+
+    partidas: List[Tuple[str, str, str]] = []
+    lower: List[List[str]] = []
+    proximo = 1
+
+    def rodada_lower(pares):
+        nonlocal proximo
+        ids = [f"L{proximo + i}" for i in range(len(pares))]
+        proximo += len(pares)
+        partidas.extend((mid, a, b) for mid, (a, b) in zip(ids, pares))
+        lower.append(ids)
+        return ids
+
+    for j, (rod, fontes) in enumerate(zip(upper, fonte_upper)):
+        partidas.extend((mid, a, b) for mid, (a, b) in zip(rod, fontes))
+        if j == 0:
+            continue
+        if j == 1:                                      # perdedores da 1ª rodada
+            p = upper[0]
+            rodada_lower([(f"L({p[2 * i]})", f"L({p[2 * i + 1]})")
+                          for i in range(len(p) // 2)])
+        queda = rodada_lower([(f"W({w})", f"L({u})") for w, u in zip(lower[-1], rod)])
+        if j < len(upper) - 1:                          # redução
+            rodada_lower([(f"W({queda[2 * i]})", f"W({queda[2 * i + 1]})")
+                          for i in range(len(queda) // 2)])
+    partidas.append(("GF", f"W({upper[-1][0]})", f"W({lower[-1][0]})"))
+
+    eliminacao = {f"Lower Round {i + 1}": ids for i, ids in enumerate(lower[:-1])}
+    eliminacao["Lower Final"] = lower[-1]
+    eliminacao["Grand Final"] = ["GF"]
+    return Formato(
+        nome=f"dupla eliminação ({n} times)",
+        entradas=S + T,
+        partidas=partidas,
+        fases={"Semifinal": upper[-2] + lower[-2], "Final": upper[-1] + lower[-1],
+               "Vencedor": ["GF"]},
+        eliminacao=eliminacao,
+    )
+
+def eliminacao_simples(n: int) -> Formato:
+    """
+    Mata-mata para n = 2^r times (ex.: playoffs após uma fase suíça).
+    Precisa de pelo menos 8 times: com 4 a chave começa na semifinal e não
+    há partida que leve a ela.
+    """
+    if n < 8 or n & (n - 1):
+        raise ValueError("eliminação simples precisa de 2^r times (r >= 3)")
+    S = [f"S{i + 1}" for i in range(n // 2)]
+    T = [f"T{i + 1}" for i in range(n // 2)]
+    rodadas = _rodadas_upper(n)
+    partidas = [(mid, S[i], T[i]) for i, mid in enumerate(rodadas[0])]
+    for ant, rod in zip(rodadas, rodadas[1:]):
+        partidas += [(mid, f"W({ant[2 * i]})", f"W({ant[2 * i + 1]})")
+                     for i, mid in enumerate(rod)]
+    nomes = [f"Round {i + 1}" for i in range(len(rodadas) - 2)] + ["Semifinal", "Final"]
+    return Formato(
+        nome=f"eliminação simples ({n} times)",
+        entradas=S + T,
+        partidas=partidas,
+        fases={"Semifinal": rodadas[-3], "Final": rodadas[-2], "Vencedor": rodadas[-1]},
+        eliminacao=dict(zip(nomes, rodadas)),
+    )
+
+# ── 2. Plano compilado ────────────────────────────────────────
+@dataclass(frozen=True, eq=False)         # hash por identidade (usado em caches)
+class Plano:
+    formato: Formato
+    ids: List[str]                  # id da partida k
+    bit: Dict[str, int]             # k por id
+    n_entradas: int
+    n_jogos: int
+    fonte_a: np.ndarray             # vaga lida como time A na partida k
+    fonte_b: np.ndarray
+    fontes: List[Tuple[int, int]]   # mesmo conteúdo, em ints (laços escalares)
+    fase_do_vencedor: np.ndarray    # índice em FASES, -1 se nenhuma
+    rodada_do_perdedor: np.ndarray  # índice em `rodadas`, -1 se o perdedor segue vivo
+    rodadas: List[str]
+
+    @property
+    def n_vagas(self) -> int:
+        return self.n_entradas + 2 * self.n_jogos
+
+    def vaga_vencedor(self, k: int) -> int:
+        return self.n_entradas + k
+
+    def vaga_perdedor(self, k: int) -> int:
+        return self.n_entradas + self.n_jogos + k
+
+    def jogos_da_fase(self, f: int) -> np.ndarray:
+        return np.flatnonzero(self.fase_do_vencedor == f)
+
+    # ── 3. Execução ───────────────────────────────────────────
+    def vagas_iniciais(self, entradas: Sequence) -> list:
+        return list(entradas) + [None] * (2 * self.n_jogos)
+
+    def confronto(self, vagas: list, k: int):
+        sa, sb = self.fontes[k]
+        return vagas[sa], vagas[sb]
+
+    def jogar(self, vagas: list, k: int, b_vence: bool):
+        """Aplica o resultado da partida k numa lista de vagas (no lugar)."""
+        a, b = self.confronto(vagas, k)
+        vagas[self.n_entradas + k], vagas[self.n_entradas + self.n_jogos + k] = \
+            (b, a) if b_vence else (a, b)
+
+    def executar_lote(self, entradas: np.ndarray,
+                      b_vence: Callable[[int, np.ndarray, np.ndarray], np.ndarray]) -> np.ndarray:
+        """
+        Roda n chaves de uma vez. `entradas` é n × n_entradas; `b_vence(k, a, b)`
+        diz em quais chaves o segundo time vence a partida k.
+        Retorna as vagas em layout n_vagas × n.
+        """
+        e, m = self.n_entradas, self.n_jogos
+        V = np.empty((self.n_vagas, len(entradas)), dtype=entradas.dtype)
+        V[:e] = entradas.T
+        for k, (sa, sb) in enumerate(self.fontes):
+            a, b = V[sa], V[sb]
+            bv = b_vence(k, a, b)
+            V[e + k] = w = np.where(bv, b, a)
+            V[e + m + k] = a + b - w                 # o outro time
+        return V
+
+def compilar(formato: Formato) -> Plano:
+    e, m = len(formato.entradas), len(formato.partidas)
+    vaga = {s: i for i, s in enumerate(formato.entradas)}
+    for k, (mid, _, _) in enumerate(formato.partidas):
+        vaga[f"W({mid})"], vaga[f"L({mid})"] = e + k, e + m + k
+    fontes = [(vaga[a], vaga[b]) for _, a, b in formato.partidas]
+    for k, fs in enumerate(fontes):
+        if any(f >= e and (f - e) % m >= k for f in fs):
+            raise ValueError(f"{formato.partidas[k][0]} usa uma partida ainda não jogada")
+
+    bit = {mid: k for k, (mid, _, _) in enumerate(formato.partidas)}
+    fase = np.full(m, -1)
+    for f, nome in enumerate(FASES):
+        fase[[bit[mid] for mid in formato.fases.get(nome, [])]] = f
+    rodadas = list(formato.eliminacao)
+    rodada = np.full(m, -1)
+    for r, ids in enumerate(formato.eliminacao.values()):
+        rodada[[bit[mid] for mid in ids]] = r
+    fa, fb = (np.array(c, dtype=np.intp) for c in zip(*fontes))
+    return Plano(formato=formato, ids=[p[0] for p in formato.partidas], bit=bit,
+                 n_entradas=e, n_jogos=m, fonte_a=fa, fonte_b=fb, fontes=fontes,
+                 fase_do_vencedor=fase, rodada_do_perdedor=rodada, rodadas=rodadas)
+
+# ── 4. Formato do campeonato ──────────────────────────────────
+DUPLA_8 = dupla_eliminacao(8)
+PLANO   = compilar(DUPLA_8)
@@ -0,0 +1,86 @@
+"""
+Probabilidades de vitória (Elo) compartilhadas por todos os módulos
+Lê elo_final_campeonato.csv uma vez por versão do arquivo, fixa os índices dos times
+e expõe a matriz N×N de probabilidades, para que os laços quentes
+façam consultas em vetor em vez de recalcular `10 **` a cada jogo.
+Com carregar_em, o mesmo modelo sai dos ratings de uma data passada
+(ver historico_elo), para projeções "como estava em D".
+"""
+
+from __future__ import annotations
+import itertools, os
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, List
+import numpy as np
+import pandas as pd
+from historico_elo import HISTORICO, ler_historico, versao_historico
+
+ELO_CSV = "data/elo_final_campeonato.csv"
+
+# ── 1. Times e permutações (a ordem define os índices) ────────
+FIXOS     = ["G2", "XLG", "FNC", "RRQ"]
+VARIAVEIS = ["PRX", "SEN", "MIBR", "TH"]
+TIMES     = FIXOS + VARIAVEIS
+INDICE    = {t: i for i, t in enumerate(TIMES)}
+PERMUT    = list(itertools.permutations(VARIAVEIS))
+
+# ── 2. Fórmula de Elo ─────────────────────────────────────────
+def prob_vitoria(elo_a, elo_b):
+    """Probabilidade de A vencer B (aceita escalares ou arrays NumPy)."""
+    return 1 / (1 + 10 ** ((elo_b - elo_a) / 400))
+
+def matriz_probabilidades(elos: Dict[str, float], times: List[str] = TIMES) -> np.ndarray:
+    """P[i, j] = probabilidade de times[i] vencer times[j]."""
+    r = np.array([elos[t] for t in times], dtype=float)
+    return prob_vitoria(r[:, None], r[None, :])
+
+# ── 3. Modelo carregado do CSV ────────────────────────────────
+@dataclass(frozen=True)
+class ModeloElo:
+    elos: Dict[str, float]        # rating por nome
+    times: List[str]              # nome por índice
+    indice: Dict[str, int]        # índice por nome
+    ordenados: List[str]          # times do maior para o menor Elo
+    P: np.ndarray                 # matriz N×N de probabilidades
+
+    def p(self, a: str, b: str) -> float:
+        """Probabilidade de a vencer b, por nome."""
+        return float(self.P[self.indice[a], self.indice[b]])
+
+    def indices(self, times: List[str]) -> List[int]:
+        return [self.indice[t] for t in times]
+
+def _modelo(elos: Dict[str, float]) -> ModeloElo:
+    # vários módulos indexam P pelos índices fixos (INDICE): faltar um time
+    # deslocaria todos os seguintes sem erro visível
+    faltando = [t for t in TIMES if t not in elos]
+    if faltando:
+        raise ValueError(f"Elo ausente para {', '.join(faltando)}")
+    times = TIMES + [t for t in elos if t not in INDICE]
+    return ModeloElo(
+        elos=elos,
+        times=times,
+        indice={t: i for i, t in enumerate(times)},
+        ordenados=sorted(elos, key=elos.get, reverse=True),
+        P=matriz_probabilidades(elos, times),
+    )
+
+# O cache é por (caminho, mtime): um processo longo (o app) passa a usar os
+# ratings novos assim que calculo_elo_completo.py regrava os arquivos
+def carregar(caminho: str = ELO_CSV) -> ModeloElo:
+    """Modelo do CSV; times fora de TIMES vão para o fim (todos os de TIMES são obrigatórios)."""
+    return _carregar(caminho, os.stat(caminho).st_mtime_ns)
+
+@lru_cache(maxsize=4)
+def _carregar(caminho: str, versao: int) -> ModeloElo:
+    df = pd.read_csv(caminho)
+    return _modelo(dict(zip(df["time"], df["elo_final"].astype(float))))
+
+def carregar_em(data, caminho: str = HISTORICO) -> ModeloElo:
+    """Modelo com os ratings dos times do campeonato ao fim do dia `data`."""
+    return _carregar_em(data, caminho, versao_historico(caminho))
+
+@lru_cache(maxsize=None)
+def _carregar_em(data, caminho: str, versao: tuple) -> ModeloElo:
+    return _modelo(ler_historico(caminho).em(data, TIMES))
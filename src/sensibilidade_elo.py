@@ -0,0 +1,110 @@
+"""
+Sensibilidade das chances de título ao Elo de cada time
+Em vez de editar elo_final_campeonato.csv e rodar o simulador de novo,
+monta de uma vez todos os vetores de ratings perturbados (cada time
+deslocado em uma grade de -amplitude a +amplitude pontos), empilha as
+matrizes de probabilidade e resolve todas pelo cálculo exato em lote
+(ver fases_exatas). Daí saem a tabela time × time (quanto o título de
+cada linha muda quando o Elo da coluna sobe `delta` pontos) e os dados
+do gráfico de tornado.
+Gera: data/sensibilidade_elo.csv e data/tornado_elo.csv
+"""
+
+from __future__ import annotations
+import time
+from typing import Optional
+import numpy as np
+import pandas as pd
+from fases_exatas import probabilidades_fases_lote
+from probabilidades import FIXOS, VARIAVEIS, ModeloElo, carregar, carregar_em, prob_vitoria
+
+# ── 0. Configuração ───────────────────────────────────────────
+SAIDA         = "data/sensibilidade_elo.csv"
+SAIDA_TORNADO = "data/tornado_elo.csv"
+delta         = 25            # ± pontos da tabela e do tornado
+amplitude     = 100           # varredura de -amplitude a +amplitude pontos...
+passo         = 1             # ...de `passo` em `passo` (8 times × 201 vetores)
+alvo          = None          # time do tornado; None = favorito ao título
+data_ratings  = None          # ex.: "2025-04-01"; None = ratings atuais
+
+# ── 1. Lote de ratings → chances de título ────────────────────
+def titulos_lote(R: np.ndarray, modelo: ModeloElo) -> np.ndarray:
+    """Chance de título (0–1) de cada time para cada linha de R (B × times): B × times."""
+    Ps = prob_vitoria(R[:, :, None], R[:, None, :])
+    fases = probabilidades_fases_lote(Ps, modelo.indices(FIXOS), modelo.indices(VARIAVEIS))
+    return fases[:, :, -1]
+
+def varredura(modelo: ModeloElo, valores: np.ndarray) -> np.ndarray:
+    """
+    curvas[j, v, i] = título do time i com o Elo do time j deslocado em
+    valores[v] (os demais fixos). Todos os vetores vão num único lote.
+    """
+    base = np.array([modelo.elos[t] for t in modelo.times])
+    n, m = len(base), len(valores)
+    R = np.broadcast_to(base, (n, m, n)).copy()
+    R[np.arange(n), :, np.arange(n)] += valores
+    return titulos_lote(R.reshape(n * m, n), modelo).reshape(n, m, n)
+
+# ── 2. Tabela time × time e tornado ───────────────────────────
+def sensibilidade(curvas: np.ndarray, valores: np.ndarray, delta: float,
+                  modelo: ModeloElo) -> pd.DataFrame:
+    """
+    Linha i, coluna j: variação (p.p.) do título de i quando o Elo de j sobe
+    `delta` pontos, pela diferença central (título(+delta) - título(-delta)) / 2.
+    """
+    mais, menos = np.searchsorted(valores, [delta, -delta])
+    J = (curvas[:, mais, :] - curvas[:, menos, :]).T / 2 * 100
+    return pd.DataFrame(J, index=modelo.times, columns=modelo.times) \
+             .loc[modelo.ordenados, modelo.ordenados]
+
+def tornado(curvas: np.ndarray, valores: np.ndarray, delta: float,
+            modelo: ModeloElo, alvo: Optional[str] = None) -> pd.DataFrame:
+    """Título de `alvo` (%) com o Elo de cada time em -delta / +delta, da maior faixa à menor."""
+    alvo = alvo or modelo.ordenados[0]
+    i = modelo.indice[alvo]
+    zero, mais, menos = np.searchsorted(valores, [0, delta, -delta])
+    df = pd.DataFrame({
+        "base": curvas[:, zero, i] * 100,
+        f"-{delta:g}": curvas[:, menos, i] * 100,
+        f"+{delta:g}": curvas[:, mais, i] * 100,
+    }, index=pd.Index(modelo.times, name=f"Elo alterado (título de {alvo})"))
+    df["faixa"] = (df[f"+{delta:g}"] - df[f"-{delta:g}"]).abs()
+    return df.sort_values("faixa", ascending=False)
+
+# ── 3. Execução ───────────────────────────────────────────────
+def main():
+    import matplotlib.pyplot as plt
+    modelo = carregar() if data_ratings is None else carregar_em(data_ratings)
+    valores = np.union1d(np.arange(-amplitude, amplitude + passo, passo), [-delta, 0, delta])
+
+    t = time.perf_counter()
+    curvas = varredura(modelo, valores)
+    print(f"{curvas.shape[0] * curvas.shape[1]:,} vetores de ratings em "
+          f"{time.perf_counter() - t:.2f} s")
+
+    J = sensibilidade(curvas, valores, delta, modelo)
+    J.to_csv(SAIDA)
+    print(f"\nVariação do título (p.p.) da linha com +{delta:g} de Elo da coluna:")
+    print(J.round(2).to_string())
+
+    escolhido = alvo or modelo.ordenados[0]
+    tor = tornado(curvas, valores, delta, modelo, escolhido)
+    tor.to_csv(SAIDA_TORNADO)
+    print()
+    print(tor.round(2).to_string())
+
+    # Gráfico de tornado (barras de -delta a +delta em torno da base)
+    base = tor["base"].iloc[0]
+    y = np.arange(len(tor))[::-1]
+    fig, ax = plt.subplots(figsize=(9, 5))
+    ax.barh(y, tor[f"-{delta:g}"] - base, left=base, color="tab:red", label=f"-{delta:g} de Elo")
+    ax.barh(y, tor[f"+{delta:g}"] - base, left=base, color="tab:green", label=f"+{delta:g} de Elo")
+    ax.axvline(base, color="black", lw=1)
+    ax.set_yticks(y, tor.index)
+    ax.set(title=f"Chance de título de {escolhido} com ±{delta:g} de Elo", xlabel="%")
+    ax.legend()
+    fig.tight_layout()
+    plt.show()
+
+if __name__ == "__main__":
+    main()
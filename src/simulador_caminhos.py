@@ -1,123 +1,162 @@
 """
 Simula todos os caminhos válidos (double-elim, 8 equipes)
-Gera: caminhos_campeonato.json
+Gera: caminhos.parquet (perm + máscara de resultados, ver codificacao_caminhos),
+gravado em streaming, um row group por vez
+Com processos > 1, permutações (ou sub-árvores abaixo de `profundidade`
+partidas) são repartidas em blocos contíguos e enumeradas em paralelo;
+cada worker grava um shard por bloco e os shards são unidos, já em Arrow,
+na mesma ordem da busca serial.
+Ao final o arquivo é reorganizado por campeão (row groups por time,
+probabilidade decrescente), para leitura com filtro por campeão, e os
+agregados (ver agregados_caminhos) são gravados ao lado.
 """
 
 from __future__ import annotations
-import itertools, json
-from dataclasses import dataclass, field, replace
-from typing import Dict, List, Tuple
-import pandas as pd
+import os, tempfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, List, Tuple
+import pyarrow.parquet as pq
+from codificacao_caminhos import (FIXOS, INDICE, PERMUT, TIMES,
+                                  LINHAS_POR_GRUPO, EscritorCaminhos,
+                                  ler_caminhos, reorganizar_por_campeao)
+from agregados_caminhos import AGREGADOS, agregar, salvar_agregados
+from plano_chave import PLANO
+from probabilidades import carregar
+
+# ── 0. Configuração ───────────────────────────────────────────
+SAIDA        = "data/caminhos.parquet"
+processos    = os.cpu_count() or 1   # 1 = enumeração serial
+profundidade = 0                     # 0 = uma unidade por permutação
+blocos_por_processo = 4              # tarefas (e shards) por processo
 
 # ── 1. Probabilidades (ELO) ───────────────────────────────────
-elos = dict(zip(*pd.read_csv("elo_final_campeonato.csv").values.T))
-
-def prob(a: str, b: str) -> float:
-    return 1 / (1 + 10 ** ((elos[b] - elos[a]) / 400))
-
-# ── 2. Equipes fixas e variáveis ──────────────────────────────
-fixos      = ["G2", "XLG", "FNC", "RRQ"]
-variaveis  = ["PRX", "SEN", "MIBR", "TH"]
-permut     = list(itertools.permutations(variaveis))
-
-# ── 3. Agenda oficial (place-holders T1-T4) ───────────────────
-AGENDA: List[Tuple[str, str, str]] = [
-    ("U1", "G2" , "T1"),
-    ("U2", "XLG", "T2"),
-    ("U3", "FNC", "T3"),
-    ("U4", "RRQ", "T4"),
-    ("U5", "W(U1)", "W(U2)"),
-    ("U6", "W(U3)", "W(U4)"),
-    ("L1", "L(U1)", "L(U2)"),
-    ("L2", "L(U3)", "L(U4)"),
-    ("L3", "W(L1)", "L(U5)"),
-    ("L4", "W(L2)", "L(U6)"),
-    ("L5", "W(L3)", "W(L4)"),
-    ("U7", "W(U5)", "W(U6)"),
-    ("L6", "W(L5)", "L(U7)"),
-    ("GF", "W(U7)", "W(L6)"),
-]
-
-# ── 4. Estado do torneio ──────────────────────────────────────
-@dataclass
-class Estado:
-    W: Dict[str, str] = field(default_factory=dict)      # vencedor por id
-    L: Dict[str, str] = field(default_factory=dict)      # perdedor  por id
-    derrotas: Dict[str, int] = field(default_factory=dict)
-    hist: List[str] = field(default_factory=list)
-    p: float = 1.0
-    fim: bool = False
-    campeao: str | None = None
-
-    def clone(self) -> "Estado":
-        return replace(self,
-                       W=self.W.copy(),
-                       L=self.L.copy(),
-                       derrotas=self.derrotas.copy(),
-                       hist=self.hist[:])
-
-# ── 5. Resolve fontes A/B de cada partida ─────────────────────
-def resolve(src: str, st: Estado) -> str:
-    if src in elos:                 # time fixo
-        return src
-    tag, mid = src[0], src[2:-1]    # W(U1) → tag=W, mid=U1
-    return (st.W if tag == "W" else st.L)[mid]
-
-# ── 6. Próxima partida pendente ───────────────────────────────
-def proxima(st: Estado, agenda):
-    for mid, A, B in agenda:
-        if mid not in st.W:
-            try:
-                a, b = resolve(A, st), resolve(B, st)
-            except KeyError:
-                return None
-            if st.derrotas.get(a,0) < 2 and st.derrotas.get(b,0) < 2:
-                return mid, a, b
-    return None
-
-# ── 7. Expande um estado ──────────────────────────────────────
-def expandir(st: Estado, agenda) -> List[Estado]:
-    nxt = proxima(st, agenda)
-    if not nxt:
-        return []
-    mid, a, b = nxt
-    pa, pb = prob(a,b), 1 - prob(a,b)
-    filhos = []
-    for vencedor, perdedor, pv in ((a,b,pa), (b,a,pb)):
-        novo = st.clone()
-        novo.hist.append(f"{mid}: {vencedor} > {perdedor} ({pv:.2%})")
-        novo.p *= pv
-        novo.W[mid] = vencedor
-        novo.L[mid] = perdedor
-        novo.derrotas[perdedor] = novo.derrotas.get(perdedor,0) + 1
-        if mid == "GF":
-            novo.fim, novo.campeao = True, vencedor
-        filhos.append(novo)
-    return [f for f in filhos
-            if max(f.derrotas.values(), default=0) <= 2]
-
-# ── 8. Simulação completa ─────────────────────────────────────
-resultados = []
-for perm in permut:
-    subs = dict(zip(["T1","T2","T3","T4"], perm))
-    agenda = [(mid,
-               subs.get(A, A),
-               subs.get(B, B)) for mid,A,B in AGENDA]
-
-    inicial = Estado(derrotas={t:0 for t in fixos+list(perm)})
-    pilha = [inicial]
-
-    while pilha:
-        est = pilha.pop()
-        if est.fim:
-            resultados.append({"caminho": est.hist,
-                               "probabilidade": est.p,
-                               "campeao": est.campeao})
-        else:
-            pilha.extend(expandir(est, agenda))
-
-# ── 9. Salva JSON ─────────────────────────────────────────────
-with open("caminhos_campeonato.json","w",encoding="utf-8") as fp:
-    json.dump(resultados, fp, ensure_ascii=False, indent=2)
-
-print("Total de caminhos válidos:", len(resultados))
+# P[i][j] com índices de TIMES (listas puras: acesso mais rápido na DFS)
+P = carregar().P.tolist()
+
+# ── 2-3. Equipes, permutações e agenda: codificacao_caminhos ──
+fixos  = FIXOS
+permut = PERMUT
+
+# ── 4. Plano compilado em vagas (ver plano_chave) ─────────────
+# vaga[0:E]          → times de entrada (G2, XLG, FNC, RRQ, T1-T4)
+# vaga[E + k]        → vencedor da partida k
+# vaga[E + N + k]    → perdedor da partida k
+E       = PLANO.n_entradas
+N_JOGOS = PLANO.n_jogos
+FONTES  = PLANO.fontes
+
+# ── 5. Estado mutável único da DFS ────────────────────────────
+class Enumerador:
+    """
+    Uma lista de vagas e um contador de derrotas, alterados no lugar
+    (push) e restaurados na volta da recursão (pop). A partida da
+    profundidade k é sempre a k-ésima do plano.
+    """
+
+    def __init__(self, i: int):
+        self.i = i
+        self.vaga = ([INDICE[t] for t in fixos] + [INDICE[t] for t in permut[i]]
+                     + [0] * (2 * N_JOGOS))
+        self.derrotas = [0] * len(TIMES)
+        self.mascaras: List[int] = []
+        self.probs: List[float] = []
+        self.campeoes: List[int] = []
+
+    def jogar(self, k: int, b_vence: bool) -> float:
+        """Aplica o resultado da partida k e devolve sua probabilidade."""
+        sa, sb = FONTES[k]
+        a, b = self.vaga[sa], self.vaga[sb]
+        w, l = (b, a) if b_vence else (a, b)
+        self.vaga[E + k], self.vaga[E + N_JOGOS + k] = w, l
+        self.derrotas[l] += 1
+        return 1 - P[a][b] if b_vence else P[a][b]
+
+    def dfs(self, k: int, p: float, mascara: int, saida: EscritorCaminhos):
+        vaga, derrotas = self.vaga, self.derrotas
+        sa, sb = FONTES[k]
+        a, b = vaga[sa], vaga[sb]
+        if derrotas[a] >= 2 or derrotas[b] >= 2:      # time já eliminado
+            return
+        pa = P[a][b]
+        if k == N_JOGOS - 1:                           # GF: grava as duas folhas
+            self.mascaras += (mascara | 1 << k, mascara)
+            self.probs    += (p * (1 - pa), p * pa)
+            self.campeoes += (b, a)
+            if len(self.mascaras) >= LINHAS_POR_GRUPO:
+                self.descarregar(saida)
+            return
+        w, l = E + k, E + N_JOGOS + k
+        # mesma ordem da pilha original: primeiro a vitória de B
+        vaga[w], vaga[l] = b, a
+        derrotas[a] += 1
+        self.dfs(k + 1, p * (1 - pa), mascara | 1 << k, saida)
+        derrotas[a] -= 1
+        vaga[w], vaga[l] = a, b
+        derrotas[b] += 1
+        self.dfs(k + 1, p * pa, mascara, saida)
+        derrotas[b] -= 1
+
+    def descarregar(self, saida: EscritorCaminhos):
+        saida.adicionar_lote(self.i, self.mascaras, self.probs, self.campeoes)
+        self.mascaras, self.probs, self.campeoes = [], [], []
+
+def enumerar(i: int, k: int, prefixo: int, saida: EscritorCaminhos):
+    """Enumera a sub-árvore da permutação i após as k partidas de `prefixo`."""
+    en, p = Enumerador(i), 1.0
+    for j in range(k):
+        p *= en.jogar(j, bool(prefixo >> j & 1))
+    en.dfs(k, p, prefixo, saida)
+    en.descarregar(saida)
+
+# ── 6. Unidades de trabalho (ordem da busca serial) ───────────
+def _prefixos(k: int, j: int = 0, mascara: int = 0) -> Iterator[int]:
+    """Máscaras das k primeiras partidas, vitória de B primeiro (ordem da DFS)."""
+    if j == k:
+        yield mascara
+        return
+    yield from _prefixos(k, j + 1, mascara | 1 << j)
+    yield from _prefixos(k, j + 1, mascara)
+
+def unidades(prof: int) -> Iterator[Tuple[int, int, int]]:
+    """(perm, k, prefixo) com k = min(prof, N_JOGOS - 1), na ordem da DFS serial."""
+    k = min(prof, N_JOGOS - 1)
+    for i in range(len(permut)):
+        for prefixo in _prefixos(k):
+            yield i, k, prefixo
+
+def blocos(lista: list, n: int) -> List[list]:
+    """Até n fatias contíguas de `lista` (a concatenação mantém a ordem)."""
+    tam = -(-len(lista) // n)
+    return [lista[j:j + tam] for j in range(0, len(lista), tam)]
+
+def _enumerar_shard(tarefa) -> str:
+    n, bloco, pasta = tarefa
+    destino = os.path.join(pasta, f"shard_{n:05d}.parquet")
+    with EscritorCaminhos(destino) as saida:
+        for i, k, prefixo in bloco:
+            enumerar(i, k, prefixo, saida)
+    return destino
+
+# ── 7. Simulação completa (gravação em streaming) ─────────────
+def main():
+    with tempfile.TemporaryDirectory(dir=".") as pasta:
+        bruto = os.path.join(pasta, "caminhos_dfs.parquet")     # ordem da DFS
+        with EscritorCaminhos(bruto) as saida:
+            if processos <= 1:
+                for i, k, prefixo in unidades(0):
+                    enumerar(i, k, prefixo, saida)
+            else:
+                with ProcessPoolExecutor(processos) as pool:
+                    tarefas = [(n, b, pasta) for n, b in enumerate(blocos(
+                        list(unidades(profundidade)), processos * blocos_por_processo))]
+                    for shard in pool.map(_enumerar_shard, tarefas):   # mantém a ordem
+                        saida.adicionar_tabela(pq.read_table(shard))
+                        os.remove(shard)
+        total = reorganizar_por_campeao(bruto, SAIDA)
+    salvar_agregados(agregar(ler_caminhos(SAIDA, colunas=["perm", "mascara",
+                                                          "probabilidade"])), AGREGADOS)
+
+    print("Total de caminhos válidos:", total)
+
+if __name__ == "__main__":
+    main()
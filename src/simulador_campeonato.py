@@ -1,51 +1,26 @@
-
-import pandas as pd
-import random
-import itertools
-from collections import Counter
-
-# Função de probabilidade baseada no ELO
-def prob_vitoria(elo_a, elo_b):
-    return 1 / (1 + 10 ** ((elo_b - elo_a) / 400))
-
-# Função para simular um confronto entre dois times
-def simular_jogo(time_a, time_b):
-    p = prob_vitoria(elos[time_a], elos[time_b])
-    return time_a if random.random() < p else time_b
-
-# Função para simular o campeonato com cabeças fixos e permutação de adversários
-def simular_bracket_restrito(adversarios):
-    uqf1 = simular_jogo('G2', adversarios[0])
-    uqf2 = simular_jogo('XLG', adversarios[1])
-    uqf3 = simular_jogo('FNC', adversarios[2])
-    uqf4 = simular_jogo('RRQ', adversarios[3])
-
-    usf1 = simular_jogo(uqf1, uqf2)
-    usf2 = simular_jogo(uqf3, uqf4)
-    uf = simular_jogo(usf1, usf2)
-
-    lr1a = simular_jogo('G2' if uqf1 != 'G2' else adversarios[0],
-                        'XLG' if uqf2 != 'XLG' else adversarios[1])
-    lr1b = simular_jogo('FNC' if uqf3 != 'FNC' else adversarios[2],
-                        'RRQ' if uqf4 != 'RRQ' else adversarios[3])
-
-    lr2a = simular_jogo(uqf1 if uqf1 != usf1 else uqf2, lr1a)
-    lr2b = simular_jogo(uqf3 if uqf3 != usf2 else uqf4, lr1b)
-
-    lr3 = simular_jogo(lr2a, lr2b)
-    lf = simular_jogo(usf1 if usf1 != uf else usf2, lr3)
-
-    gf = simular_jogo(uf, lf)
-    return gf
+import itertools, os
+import numpy as np
+from motor_monte_carlo import simular_adaptativo, simular_paralelo
+from probabilidades import carregar, carregar_em
 
 # =========================== INÍCIO ===========================
 
 # Número de simulações por permutação
 sim_por_bracket = 10000
 
-# Carregar ELO do .csv
-df_elo = pd.read_csv("data/elo_final_campeonato.csv")
-elos = dict(zip(df_elo['time'], df_elo['elo_final']))
+# Semente (None = nova a cada execução, impressa ao final) e processos
+semente   = None
+processos = os.cpu_count() or 1
+
+# Tolerância (ex.: 0.005 = ±0,5 p.p.): simula em lotes até os intervalos
+# de 95% caberem nela, em vez de usar sim_por_bracket. None = desligado
+tolerancia = None
+
+# Data dos ratings (ex.: "2025-04-01", via historico_elo); None = ratings atuais
+data_ratings = None
+
+# Carregar ELO do .csv (matriz de probabilidades + índices dos times)
+modelo = carregar() if data_ratings is None else carregar_em(data_ratings)
 
 # Definir cabeças fixos e permutar os outros
 times_fixos = ['G2', 'XLG', 'FNC', 'RRQ']
@@ -53,20 +28,42 @@ times_variaveis = ['PRX', 'SEN', 'MIBR', 'TH']
 permutacoes_validas = list(itertools.permutations(times_variaveis))
 
 # Ordenação para exibir
-times_ordenados = df_elo.sort_values(by='elo_final', ascending=False)['time'].tolist()
-
-# Simulações
-contagem = Counter()
-for perm in permutacoes_validas:
-    for _ in range(sim_por_bracket):
-        vencedor = simular_bracket_restrito(perm)
-        contagem[vencedor] += 1
-
-# Calcular probabilidades
-total = sum(contagem.values())
-probabilidades = {time: (contagem[time] / total) * 100 for time in times_ordenados}
-
-# Exibir resultados
-print("Probabilidade de cada time ser campeão (com cabeças fixos):")
-for time, prob in sorted(probabilidades.items(), key=lambda x: x[1], reverse=True):
-    print(f"{time}: {prob:.2f}%")
+times_ordenados = modelo.ordenados
+
+def main():
+    # Simulações (motor vetorizado, unidades permutação × lote em paralelo)
+    s = np.random.SeedSequence().entropy if semente is None else semente
+    if tolerancia is not None:
+        return adaptativo(s)
+    fases = simular_paralelo(modelo.P,
+                             modelo.indices(times_fixos),
+                             modelo.indices(times_variaveis),
+                             sim_por_bracket, s, processos)
+    contagem = dict(zip(modelo.times, fases[:, -1]))
+
+    # Calcular probabilidades
+    total = sim_por_bracket * len(permutacoes_validas)
+    probabilidades = {time: (contagem[time] / total) * 100 for time in times_ordenados}
+
+    # Exibir resultados
+    print("Probabilidade de cada time ser campeão (com cabeças fixos):")
+    for time, prob in sorted(probabilidades.items(), key=lambda x: x[1], reverse=True):
+        print(f"{time}: {prob:.2f}%")
+    print(f"(semente: {s})")
+
+def adaptativo(s):
+    est = simular_adaptativo(modelo.P,
+                             modelo.indices(times_fixos),
+                             modelo.indices(times_variaveis),
+                             tolerancia, rng=s)
+    idx = dict(zip(modelo.times, range(len(modelo.times))))
+    print("Probabilidade de cada time ser campeão (com cabeças fixos, IC 95%):")
+    for time in sorted(times_ordenados, key=lambda t: -est.probabilidades[idx[t], -1]):
+        p, d = est.probabilidades[idx[time], -1] * 100, est.meia_largura[idx[time], -1] * 100
+        print(f"{time}: {p:.2f}% ± {d:.2f}")
+    print(f"({est.amostras} amostras, {est.simulacoes} chaves simuladas"
+          f"{'' if est.convergiu else ', tolerância não atingida'}; semente: {s})")
+
+# o guard evita que os processos do pool reexecutem o script
+if __name__ == "__main__":
+    main()
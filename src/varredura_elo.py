@@ -0,0 +1,104 @@
+"""
+Varredura de hiperparâmetros do Elo com backtest
+Avalia de uma vez uma grade de configurações (K baixo/médio/alto,
+limites de delta de rounds e Elo inicial) sobre o histórico de partidas:
+todas as configurações são atualizadas juntas como vetores, partida a
+partida, e cada uma recebe log-loss e Brier nas partidas de teste
+(as mais recentes), previstas antes de seu próprio resultado ser aplicado.
+Gera: data/varredura_elo.csv
+"""
+
+from __future__ import annotations
+import itertools
+import numpy as np
+import pandas as pd
+from calculo_elo_completo import (ELO_INICIAL, Partidas, k_dinamico,
+                                  ler_partidas, preparar_partidas)
+
+# ── 0. Configuração ───────────────────────────────────────────
+SAIDA        = "data/varredura_elo.csv"
+fracao_teste = 0.25          # últimas partidas (por data) usadas para pontuar
+# A mesma partida pode aparecer uma vez para cada time; calculo_elo_completo
+# aplica as duas cópias, então a varredura também (True = só uma cópia,
+# o que pontua um modelo diferente do usado em produção)
+deduplicar   = False
+
+GRADE = {
+    "k_baixo":     [8, 12, 16, 20, 24],
+    "k_medio":     [16, 24, 32, 40, 48],
+    "k_alto":      [32, 40, 48, 56, 64, 80],
+    "limite_baixo": [5, 8, 10, 12, 15],
+    "limite_alto":  [20, 25, 30, 35],
+    # Todos os times partem do mesmo valor, então só diferenças importam:
+    # o Elo inicial desloca os ratings mas não muda as previsões.
+    "elo_inicial": [ELO_INICIAL],
+}
+ATUAL = {"k_baixo": 16, "k_medio": 32, "k_alto": 48,
+         "limite_baixo": 10, "limite_alto": 25, "elo_inicial": ELO_INICIAL}
+
+# ── 1. Grade de configurações ─────────────────────────────────
+def montar_grade(grade=GRADE) -> pd.DataFrame:
+    """Produto cartesiano, mantendo só K crescente e limites em ordem."""
+    cfg = pd.DataFrame(list(itertools.product(*grade.values())), columns=list(grade))
+    ok = ((cfg.k_baixo <= cfg.k_medio) & (cfg.k_medio <= cfg.k_alto)
+          & (cfg.limite_baixo < cfg.limite_alto))
+    return cfg[ok].reset_index(drop=True)
+
+def remover_duplicadas(df: pd.DataFrame) -> pd.DataFrame:
+    """Mantém uma linha por (data, par de times)."""
+    par = np.sort(df[['time_a', 'time_b']].to_numpy(dtype=str), axis=1)
+    chave = pd.DataFrame({'data': df['data'].to_numpy(), 'x': par[:, 0], 'y': par[:, 1]})
+    return df[~chave.duplicated().to_numpy()]
+
+# ── 2. Backtest vetorizado ────────────────────────────────────
+def backtest(partidas: Partidas, cfg: pd.DataFrame, fracao: float = fracao_teste) -> pd.DataFrame:
+    """
+    Roda a recorrência de Elo para todas as linhas de `cfg` ao mesmo tempo
+    (matriz configurações × times) e devolve `cfg` com log_loss e brier.
+    """
+    col = lambda c: cfg[c].to_numpy(dtype=float)[:, None]
+    K = k_dinamico(partidas.delta[None, :], partidas.prorroga[None, :],
+                   k=(col("k_baixo"), col("k_medio"), col("k_alto")),
+                   limites=(col("limite_baixo"), col("limite_alto")))
+    R = np.repeat(col("elo_inicial"), len(partidas.nomes), axis=1)
+
+    n = len(partidas)
+    inicio_teste = int(round(n * (1 - fracao)))
+    log_loss, brier = np.zeros(len(cfg)), np.zeros(len(cfg))
+    for j, (a, b, s) in enumerate(zip(partidas.ia.tolist(), partidas.ib.tolist(),
+                                      partidas.score_a.tolist())):
+        esperado = 1 / (1 + 10 ** ((R[:, b] - R[:, a]) / 400))
+        if j >= inicio_teste:
+            p = np.clip(esperado if s else 1 - esperado, 1e-12, 1)
+            log_loss -= np.log(p)
+            brier += (esperado - s) ** 2
+        d = K[:, j] * (s - esperado)
+        R[:, a] += d
+        R[:, b] -= d
+
+    n_teste = max(n - inicio_teste, 1)
+    return cfg.assign(log_loss=log_loss / n_teste, brier=brier / n_teste)
+
+# ── 3. Execução ───────────────────────────────────────────────
+def main():
+    df, _, _ = ler_partidas()
+    if deduplicar:
+        df = remover_duplicadas(df)
+    partidas = preparar_partidas(df)
+
+    grade = montar_grade()
+    if not (grade[list(ATUAL)] == pd.Series(ATUAL)).all(axis=1).any():
+        grade = pd.concat([grade, pd.DataFrame([ATUAL])], ignore_index=True)
+
+    res = backtest(partidas, grade).sort_values("log_loss").reset_index(drop=True)
+    res.to_csv(SAIDA, index=False)
+
+    atual = res.index[(res[list(ATUAL)] == pd.Series(ATUAL)).all(axis=1)][0]
+    print(f"{len(res):,} configurações × {len(partidas)} partidas "
+          f"({len(partidas) - int(round(len(partidas) * (1 - fracao_teste)))} de teste)")
+    print(res.head(10).to_string())
+    print(f"\nConfiguração atual (16/32/48, 10/25): posição {atual + 1} de {len(res)}")
+    print(res.loc[[atual]].to_string())
+
+if __name__ == "__main__":
+    main()
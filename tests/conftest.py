@@ -0,0 +1,4 @@
+import os, sys
+
+# os scripts ficam em src/ e se importam pelo nome do módulo
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir, "src"))
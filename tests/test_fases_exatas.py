@@ -0,0 +1,56 @@
+"""
+Cálculo exato por fase conferido contra a enumeração completa: todos os
+24 sorteios × 2^14 resultados (393.216 caminhos), com a probabilidade de
+cada caminho somada ao vencedor de cada partida que vale uma fase.
+"""
+
+import itertools
+import numpy as np
+import pytest
+from fases_exatas import probabilidades_fases, probabilidades_fases_lote
+from plano_chave import FASES, PLANO
+from probabilidades import prob_vitoria
+
+CABECAS, VARIAVEIS = [0, 1, 2, 3], [4, 5, 6, 7]
+
+def matriz(R: np.ndarray) -> np.ndarray:
+    return prob_vitoria(R[..., :, None], R[..., None, :])
+
+@pytest.fixture(scope="module")
+def P():
+    return matriz(1500 + 100 * np.random.default_rng(0).standard_normal(8))
+
+def fases_por_enumeracao(P: np.ndarray) -> np.ndarray:
+    perms = list(itertools.permutations(VARIAVEIS))
+    mascaras = np.arange(1 << PLANO.n_jogos)
+    entradas = np.array([CABECAS + list(p) for p in perms]).repeat(len(mascaras), axis=0)
+    mascara = np.tile(mascaras, len(perms))
+    p = np.full(len(entradas), 1 / len(perms))
+
+    def b_vence(k, a, b):
+        bv = (mascara >> k & 1).astype(bool)
+        p[:] *= np.where(bv, 1 - P[a, b], P[a, b])
+        return bv
+
+    V = PLANO.executar_lote(entradas, b_vence)
+    assert len(p) == 393_216
+    assert p.sum() == pytest.approx(1)
+    fases = np.zeros((len(P), len(FASES)))
+    for k in range(PLANO.n_jogos):
+        if (f := PLANO.fase_do_vencedor[k]) >= 0:
+            fases[:, f] += np.bincount(V[PLANO.vaga_vencedor(k)], weights=p, minlength=len(P))
+    return fases
+
+def test_fases_igual_a_enumeracao_completa(P):
+    np.testing.assert_allclose(probabilidades_fases(P, CABECAS, VARIAVEIS),
+                               fases_por_enumeracao(P), rtol=0, atol=1e-12)
+
+def test_lote_igual_a_cada_matriz(P):
+    rng = np.random.default_rng(1)
+    R = 1500 + 100 * rng.standard_normal((40, 8))     # mais que um bloco de LOTE_MATRIZES
+    Ps = matriz(R)
+    lote = probabilidades_fases_lote(Ps, CABECAS, VARIAVEIS)
+    assert lote.shape == (len(Ps), 8, len(FASES))
+    for Pi, fi in zip(Ps, lote):
+        np.testing.assert_allclose(fi, probabilidades_fases(Pi, CABECAS, VARIAVEIS),
+                                   rtol=0, atol=1e-12)
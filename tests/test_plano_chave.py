@@ -0,0 +1,60 @@
+"""
+Geradores de chave genéricos (plano_chave) além da dupla eliminação de 8:
+eliminação simples de 8 e 16 times conferida por força bruta (todas as
+2^m combinações de resultados) e dupla eliminação de 16 conferida por
+Monte Carlo, sempre contra o cálculo exato por fase.
+"""
+
+import numpy as np
+import pytest
+from fases_exatas import probabilidades_condicionais
+from motor_monte_carlo import simular_entradas
+from plano_chave import FASES, compilar, dupla_eliminacao, eliminacao_simples
+from probabilidades import prob_vitoria
+
+def matriz(n: int) -> np.ndarray:
+    R = 1500 + 100 * np.random.default_rng(n).standard_normal(n)
+    return prob_vitoria(R[:, None], R[None, :])
+
+def exato(P: np.ndarray, plano) -> np.ndarray:
+    n = plano.n_entradas
+    return probabilidades_condicionais(P, range(n // 2), range(n // 2, n), {}, plano)
+
+def fases_por_enumeracao(P: np.ndarray, plano) -> np.ndarray:
+    """Soma, sobre todas as 2^m máscaras, a probabilidade de cada caminho por fase."""
+    mascara = np.arange(1 << plano.n_jogos)
+    entradas = np.tile(np.arange(plano.n_entradas), (len(mascara), 1))
+    p = np.ones(len(mascara))
+
+    def b_vence(k, a, b):
+        bv = (mascara >> k & 1).astype(bool)
+        p[:] *= np.where(bv, 1 - P[a, b], P[a, b])
+        return bv
+
+    V = plano.executar_lote(entradas, b_vence)
+    assert p.sum() == pytest.approx(1)
+    fases = np.zeros((len(P), len(FASES)))
+    for k in range(plano.n_jogos):
+        if (f := plano.fase_do_vencedor[k]) >= 0:
+            fases[:, f] += np.bincount(V[plano.vaga_vencedor(k)], weights=p, minlength=len(P))
+    return fases
+
+@pytest.mark.parametrize("n", [8, 16])
+def test_eliminacao_simples_igual_a_forca_bruta(n):
+    plano = compilar(eliminacao_simples(n))
+    P = matriz(n)
+    fases = exato(P, plano)
+    np.testing.assert_allclose(fases, fases_por_enumeracao(P, plano), rtol=0, atol=1e-12)
+    np.testing.assert_allclose(fases.sum(axis=0), [4, 2, 1])   # vagas por fase
+
+def test_dupla_eliminacao_16_igual_a_monte_carlo():
+    plano = compilar(dupla_eliminacao(16))
+    P, n = matriz(16), 200_000
+    fases = exato(P, plano)
+    np.testing.assert_allclose(fases.sum(axis=0), [3, 2, 1])
+    mc = simular_entradas(P, range(16), n, 0, plano) / n
+    np.testing.assert_allclose(mc, fases, rtol=0, atol=0.005)  # > 4 desvios-padrão
+
+def test_eliminacao_simples_exige_8_times():
+    with pytest.raises(ValueError):
+        eliminacao_simples(4)